@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Dataset, EquipmentRecord
+from .models import Dataset, EquipmentRecord, Job
 
 
 @admin.register(Dataset)
@@ -14,3 +14,9 @@ class EquipmentRecordAdmin(admin.ModelAdmin):
     list_display = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature', 'dataset']
     list_filter = ['equipment_type', 'dataset']
     search_fields = ['equipment_name']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'dataset', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status']
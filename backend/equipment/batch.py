@@ -0,0 +1,105 @@
+"""
+Batch report export: several dataset reports streamed as one ZIP.
+
+Reports that are not cached yet are rendered in parallel on the process
+pool. The ZIP is written to an in-memory sink and its bytes are yielded
+as soon as each report has been added, so the client receives the first
+reports while later ones are still rendering.
+"""
+
+import logging
+import zipfile
+from concurrent.futures import as_completed
+
+from .pdf_generator import DEFAULT_LAYOUT
+from .reports import render_report_file, report_path
+from .tasks import get_process_pool
+
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class ZipSink:
+    """Write-only, unseekable file object collecting ZIP bytes until they are taken."""
+    
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self.offset
+    
+    def flush(self):
+        pass
+    
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def report_name(dataset_id, full):
+    return f"equipment_report_{dataset_id}{'_full' if full else ''}.pdf"
+
+
+def iter_report_paths(datasets, full, layout):
+    """
+    Yield (dataset, path, error) for each dataset as its report becomes available.
+    
+    Cached reports come first; the rest are rendered on the process pool
+    and yielded in completion order.
+    """
+    pending = {}
+    for dataset in datasets:
+        path = report_path(dataset, full, layout)
+        if path.exists():
+            yield dataset, path, None
+        else:
+            pending[get_process_pool().submit(render_report_file, dataset.pk, full, layout)] = dataset
+    
+    for future in as_completed(pending):
+        dataset = pending[future]
+        try:
+            yield dataset, future.result(), None
+        except Exception as e:
+            logger.exception("Rendering report for dataset %s failed", dataset.pk)
+            yield dataset, None, str(e)
+
+
+def iter_report_zip(datasets, full=False, layout=DEFAULT_LAYOUT):
+    """
+    Yield the bytes of a ZIP archive holding the reports of several datasets.
+    
+    A report that fails to render is replaced by a short .txt entry with
+    the error, so one bad dataset does not abort the whole download.
+    
+    Args:
+        datasets: Dataset model instances
+        full: Include every record in each report
+        layout: Name of a registered report layout
+    """
+    sink = ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for dataset, path, error in iter_report_paths(datasets, full, layout):
+            name = report_name(dataset.pk, full)
+            if error is not None:
+                archive.writestr(f'{name}.error.txt', error)
+                continue
+            
+            with open(path, 'rb') as src, archive.open(name, 'w') as dest:
+                while True:
+                    chunk = src.read(COPY_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    yield sink.take()
+            # Entry trailer, then everything written since
+            yield sink.take()
+    yield sink.take()
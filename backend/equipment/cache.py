@@ -0,0 +1,192 @@
+"""
+Response cache for the read-only dataset endpoints.
+
+Entries live in the Django cache selected by EQUIPMENT_CACHE_ALIAS and are
+keyed by view, dataset (or history owner), requesting user and query
+string. Each dataset and each history owner has a version number that is
+part of the key; bumping it (see signals.py) invalidates every cached
+response for that dataset or history at once, without having to know the
+individual keys.
+
+Dataset responses never change once the dataset is ready, so they are
+cached in any cache, including the default per-process LocMemCache. The
+history list changes with every upload and delete, and a version bump in
+one process's local cache is not seen by the others, so history is only
+cached when the cache is shared (Redis, Memcached, database, file); see
+is_enabled().
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from rest_framework.response import Response
+
+
+KEY_PREFIX = 'equipment'
+
+# Views whose hit/miss counters are reported by cache_stats()
+CACHED_VIEWS = ['summary', 'data', 'history']
+
+
+def get_cache():
+    return caches[getattr(settings, 'EQUIPMENT_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'EQUIPMENT_CACHE_TIMEOUT', 300)
+
+
+# Backends whose entries are private to one process
+PROCESS_LOCAL_BACKENDS = [
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+]
+
+
+def is_shared_cache():
+    """Return True if the configured cache is visible to every server process."""
+    alias = getattr(settings, 'EQUIPMENT_CACHE_ALIAS', 'default')
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def is_enabled(scope='dataset'):
+    """
+    Return True if responses of a cache_response scope should be cached.
+    
+    EQUIPMENT_CACHE_RESPONSES turns caching on or off for every scope.
+    When it is None, dataset responses are always cached and history
+    responses only if the cache is shared: with a per-process cache, an
+    upload handled by one worker would leave the other workers serving a
+    stale history until their entries time out.
+    """
+    enabled = getattr(settings, 'EQUIPMENT_CACHE_RESPONSES', None)
+    if enabled is None:
+        return scope != 'history' or is_shared_cache()
+    return enabled
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if getattr(settings, 'EQUIPMENT_CACHE_RESPONSES', None) and not is_shared_cache():
+        return [checks.Warning(
+            'EQUIPMENT_CACHE_RESPONSES caches history with a per-process cache backend.',
+            hint='History invalidation is not seen by other server processes; point '
+                 'EQUIPMENT_CACHE_ALIAS at a Redis, Memcached or database cache, '
+                 'or leave EQUIPMENT_CACHE_RESPONSES at None.',
+            id='equipment.W001',
+        )]
+    return []
+
+
+def owner_id(user):
+    """Return the history owner key part for a user (None for anonymous)."""
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return None
+
+
+def version_key(scope, ident):
+    return f'{KEY_PREFIX}:version:{scope}:{ident}'
+
+
+def get_version(scope, ident):
+    """Return the current version of a dataset or history, starting one if needed."""
+    cache = get_cache()
+    key = version_key(scope, ident)
+    version = cache.get(key)
+    if version is None:
+        # A fresh timestamp never matches entries cached under an evicted version
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(scope, ident):
+    """Invalidate every cached response for a dataset or history."""
+    get_cache().set(version_key(scope, ident), time.time_ns(), timeout=None)
+
+
+def response_key(view_name, request, scope, ident):
+    query = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+    user = owner_id(request.user)
+    version = get_version(scope, ident)
+    return f'{KEY_PREFIX}:response:{view_name}:{scope}:{ident}:v{version}:u{user}:{request.get_host()}:{query}'
+
+
+def record_lookup(view_name, hit):
+    cache = get_cache()
+    key = f"{KEY_PREFIX}:stats:{view_name}:{'hits' if hit else 'misses'}"
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def cache_stats():
+    """
+    Return hit/miss counters for each cached view.
+    
+    Returns:
+        Dict mapping view name to {'hits', 'misses', 'hit_rate'}
+    """
+    cache = get_cache()
+    stats = {}
+    for view_name in CACHED_VIEWS:
+        hits = cache.get(f'{KEY_PREFIX}:stats:{view_name}:hits', 0)
+        misses = cache.get(f'{KEY_PREFIX}:stats:{view_name}:misses', 0)
+        total = hits + misses
+        stats[view_name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None,
+        }
+    return stats
+
+
+def is_ready_data(data):
+    """Return True unless the response data contains a dataset that is not ready yet."""
+    items = data if isinstance(data, list) else [data]
+    return all(item.get('status', 'ready') == 'ready' for item in items if isinstance(item, dict))
+
+
+def cache_response(view_name, scope='dataset'):
+    """
+    Cache the data of successful responses from an APIView get() method.
+    
+    Args:
+        view_name: Name used in keys and stats
+        scope: 'dataset' to version entries by the pk URL argument, or
+            'history' to version them by the requesting user
+            
+    Responses describing datasets that are still processing change
+    without a save() and are therefore never cached. Nothing is cached
+    unless is_enabled(scope).
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not is_enabled(scope):
+                return method(self, request, *args, **kwargs)
+            
+            ident = kwargs.get('pk') if scope == 'dataset' else owner_id(request.user)
+            key = response_key(view_name, request, scope, ident)
+            cache = get_cache()
+            
+            data = cache.get(key)
+            if data is not None:
+                record_lookup(view_name, hit=True)
+                return Response(data)
+            
+            record_lookup(view_name, hit=False)
+            response = method(self, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200 and is_ready_data(response.data):
+                cache.set(key, response.data, get_timeout())
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,133 @@
+"""
+Chart images for PDF reports.
+
+Charts are drawn with Matplotlib's Agg canvas directly (no pyplot, no GUI
+backend) on one Figure per thread that is cleared and reused, and the
+resulting PNG bytes are cached per dataset. Datasets never change, so a
+chart is only ever drawn once per cache lifetime.
+
+Matplotlib is optional: without it, chart_png() returns None and reports
+are rendered without charts.
+"""
+
+import logging
+import threading
+from io import BytesIO
+
+from .cache import KEY_PREFIX, get_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the chart appearance changes so cached images are redrawn
+CHART_VERSION = 1
+
+CHART_SIZE = (4, 3)
+CHART_DPI = 100
+
+PIE_COLORS = ['#3b82f6', '#10b981', '#8b5cf6', '#f59e0b', '#ef4444', '#06b6d4', '#ec4899', '#22c55e']
+BAR_COLORS = ['#3b82f6', '#10b981', '#f59e0b']
+
+_local = threading.local()
+
+
+def get_figure():
+    """
+    Return this thread's cleared Figure, or None if Matplotlib is missing.
+    
+    Figures are not thread-safe, so each thread draws on its own.
+    """
+    figure = getattr(_local, 'figure', None)
+    if figure is None:
+        try:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+        except ImportError:
+            return None
+        figure = Figure(figsize=CHART_SIZE, dpi=CHART_DPI)
+        FigureCanvasAgg(figure)
+        _local.figure = figure
+    figure.clear()
+    return figure
+
+
+def draw_type_distribution(ax, dataset):
+    distribution = dataset.type_distribution
+    if not distribution:
+        ax.text(0.5, 0.5, 'No data', ha='center', va='center', color='#64748b', fontsize=12)
+        ax.set_axis_off()
+        return
+    
+    values = list(distribution.values())
+    ax.pie(
+        values,
+        labels=list(distribution),
+        autopct='%1.1f%%',
+        colors=[PIE_COLORS[i % len(PIE_COLORS)] for i in range(len(values))],
+        textprops={'fontsize': 8},
+        wedgeprops={'edgecolor': 'white', 'linewidth': 1}
+    )
+    ax.set_title('Equipment Type Distribution', fontsize=10, fontweight='bold')
+
+
+def draw_parameter_averages(ax, dataset):
+    labels = ['Flowrate', 'Pressure', 'Temperature']
+    values = [dataset.avg_flowrate, dataset.avg_pressure, dataset.avg_temperature]
+    bars = ax.bar(labels, values, color=BAR_COLORS)
+    
+    for bar, val in zip(bars, values):
+        ax.annotate(f'{val:.1f}',
+                    xy=(bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                    xytext=(0, 3),
+                    textcoords="offset points",
+                    ha='center', va='bottom', fontsize=8)
+    
+    ax.set_title('Average Parameter Values', fontsize=10, fontweight='bold')
+    ax.tick_params(labelsize=8)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.yaxis.grid(True, linestyle='--', alpha=0.3)
+    ax.set_axisbelow(True)
+
+
+CHARTS = {
+    'type_distribution': draw_type_distribution,
+    'parameter_averages': draw_parameter_averages,
+}
+
+
+def render_chart(name, dataset):
+    """Draw a chart and return it as PNG bytes, or None without Matplotlib."""
+    figure = get_figure()
+    if figure is None:
+        return None
+    
+    # Fixed margins; tight_layout() would cost more than drawing the chart
+    figure.subplots_adjust(left=0.12, right=0.95, top=0.88, bottom=0.1)
+    CHARTS[name](figure.add_subplot(111), dataset)
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def chart_png(name, dataset):
+    """
+    Return a dataset chart as PNG bytes, drawing it on a cache miss.
+    
+    Args:
+        name: Key of CHARTS
+        dataset: Dataset model instance
+        
+    Returns:
+        PNG bytes, or None if Matplotlib is not installed
+    """
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:chart:v{CHART_VERSION}:{name}:{dataset.pk}:{dataset.uploaded_at.timestamp()}'
+    png = cache.get(key)
+    if png is None:
+        png = render_chart(name, dataset)
+        if png is None:
+            logger.warning("Matplotlib is not installed; rendering reports without charts")
+            return None
+        cache.set(key, png, None)
+    return png
@@ -0,0 +1,100 @@
+"""
+Conditional GET support (ETag / Last-Modified) for dataset endpoints.
+
+Datasets never change after upload, so a strong ETag derived from the
+dataset id and upload time identifies a response exactly. Views that vary
+with the query string mix it into the tag.
+"""
+
+import hashlib
+from functools import partial, wraps
+
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import Dataset
+from .reports import REPORT_VERSION
+
+
+def make_etag(*parts):
+    return hashlib.sha1(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def get_dataset_state(request, pk):
+    """
+    Return (uploaded_at, status, progress) for a dataset, or None if missing.
+    
+    Looked up once per request and shared by the ETag and Last-Modified
+    functions.
+    """
+    cache = request.__dict__.setdefault('_dataset_state', {})
+    if pk not in cache:
+        cache[pk] = Dataset.objects.filter(pk=pk).values_list('uploaded_at', 'status', 'progress').first()
+    return cache[pk]
+
+
+def dataset_etag(request, pk, *args, **kwargs):
+    state = get_dataset_state(request, pk)
+    if state is None:
+        return None
+    uploaded_at, dataset_status, progress = state
+    return make_etag(pk, uploaded_at.isoformat(), dataset_status, progress, request.get_full_path())
+
+
+def report_etag(request, pk, *args, **kwargs):
+    """
+    Tag a PDF report by its dataset and REPORT_VERSION.
+    
+    Reports are re-rendered when REPORT_VERSION changes, so the version is
+    part of the tag and clients holding an older PDF get the new one.
+    """
+    etag = dataset_etag(request, pk, *args, **kwargs)
+    return etag and make_etag(etag, 'report', REPORT_VERSION)
+
+
+def dataset_last_modified(request, pk, *args, **kwargs):
+    """
+    Return the upload time of a ready dataset.
+    
+    Datasets still being ingested change without their upload time
+    changing, so they get no Last-Modified and are revalidated by ETag only.
+    """
+    state = get_dataset_state(request, pk)
+    if state is None or state[1] != Dataset.READY:
+        return None
+    return state[0]
+
+
+def history_etag(request, *args, **kwargs):
+    """
+    Tag the history list by the datasets it contains.
+    
+    No Last-Modified is sent for history: deleting a dataset changes the
+    list without changing the newest upload time.
+    """
+    queryset = Dataset.objects.filter(user=request.user if request.user.is_authenticated else None)
+    keep, _ = Dataset.retention_policy(request.user)
+    entries = queryset.order_by('-uploaded_at').values_list('id', 'uploaded_at', 'status', 'progress')[:keep]
+    return make_etag(request.get_full_path(), *(
+        f'{pk}@{uploaded_at.isoformat()}:{dataset_status}:{progress}'
+        for pk, uploaded_at, dataset_status, progress in entries
+    ))
+
+
+def conditional(etag_func, last_modified_func=None):
+    """
+    Decorate an APIView method with ETag/Last-Modified handling.
+    
+    Matching If-None-Match / If-Modified-Since requests get a 304 without
+    running the view. Responses are marked private and no-cache so clients
+    keep them but revalidate on every use.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(partial(method, self))
+            response = view(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
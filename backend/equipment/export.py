@@ -0,0 +1,107 @@
+"""
+Streaming exports of equipment records.
+"""
+
+import csv
+import json
+
+import pandas as pd
+from django.conf import settings
+
+from .storage import COLUMN_FIELDS
+
+
+# EquipmentRecord fields included in exports, in output order
+EXPORT_FIELDS = ['id', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+# CSV exports carry the record fields without the id, under the upload
+# headers so an export can be uploaded again
+CSV_HEADER = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+
+DEFAULT_EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() returns the value instead of storing it."""
+    
+    def write(self, value):
+        return value
+
+
+def iter_record_rows(records, fields=EXPORT_FIELDS, chunk_size=None):
+    """
+    Iterate over a record queryset as plain tuples without caching results.
+    
+    Args:
+        records: EquipmentRecord queryset
+        fields: Record fields to fetch, in tuple order
+        chunk_size: Rows fetched from the database cursor at a time
+        
+    Returns:
+        Iterator of tuples in fields order
+    """
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'EQUIPMENT_EXPORT_CHUNK_SIZE', DEFAULT_EXPORT_CHUNK_SIZE)
+    return records.order_by('id').values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def load_record_columns(records, chunk_size=None):
+    """
+    Load a record queryset into one array per field.
+    
+    Args:
+        records: EquipmentRecord queryset
+        chunk_size: Rows fetched from the database cursor at a time
+        
+    Returns:
+        Dict mapping each COLUMN_FIELDS name to a NumPy array, the same
+        layout as storage.read_columns
+    """
+    rows = iter_record_rows(records, COLUMN_FIELDS, chunk_size)
+    frame = pd.DataFrame.from_records(rows, columns=COLUMN_FIELDS)
+    return {field: frame[field].to_numpy() for field in COLUMN_FIELDS}
+
+
+def batched(rows, size):
+    """Group an iterator into lists of at most size items."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_ndjson(rows, fields=EXPORT_FIELDS, batch_size=DEFAULT_EXPORT_CHUNK_SIZE):
+    """
+    Encode record tuples as newline-delimited JSON.
+    
+    Args:
+        rows: Iterator of tuples in fields order
+        fields: Keys for the tuple values
+        batch_size: Number of lines joined into each yielded string
+        
+    Yields:
+        Strings containing one JSON object per line
+    """
+    for batch in batched(rows, batch_size):
+        yield ''.join(json.dumps(dict(zip(fields, row))) + '\n' for row in batch)
+
+
+def iter_csv(rows, batch_size=DEFAULT_EXPORT_CHUNK_SIZE):
+    """
+    Encode record tuples as CSV in the upload format.
+    
+    Args:
+        rows: Iterator of tuples in COLUMN_FIELDS order
+        batch_size: Number of lines joined into each yielded string
+        
+    Yields:
+        Strings containing the header line followed by the record lines
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for batch in batched(rows, batch_size):
+        yield ''.join(writer.writerow(row) for row in batch)
@@ -0,0 +1,106 @@
+"""
+Query filters for equipment record endpoints.
+"""
+
+import numpy as np
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+class RecordFilter(BaseFilterBackend):
+    """
+    Filter equipment records by type and numeric ranges.
+    
+    Query parameters:
+    - type: Equipment type, or a comma-separated list of types
+    - min_flowrate / max_flowrate
+    - min_pressure / max_pressure
+    - min_temperature / max_temperature
+    """
+    range_fields = ['flowrate', 'pressure', 'temperature']
+    
+    def get_types(self, request):
+        return [t.strip() for t in request.query_params.get('type', '').split(',') if t.strip()]
+    
+    def get_bounds(self, request):
+        """Return (field, lookup, value) triples for the range parameters present."""
+        params = request.query_params
+        bounds = []
+        for field in self.range_fields:
+            for bound, lookup in (('min', 'gte'), ('max', 'lte')):
+                param = f'{bound}_{field}'
+                if param not in params:
+                    continue
+                try:
+                    value = float(params[param])
+                except ValueError:
+                    raise ValidationError({param: 'A number is required.'})
+                bounds.append((field, lookup, value))
+        return bounds
+    
+    def filter_queryset(self, request, queryset, view):
+        types = self.get_types(request)
+        if types:
+            queryset = queryset.filter(equipment_type__in=types)
+        
+        for field, lookup, value in self.get_bounds(request):
+            queryset = queryset.filter(**{f'{field}__{lookup}': value})
+        
+        return queryset
+    
+    def mask_columns(self, request, columns):
+        """
+        Return a boolean mask of the column rows matching the filters,
+        or None when no filter applies.
+        
+        Args:
+            request: The incoming request
+            columns: Dict of equal-length columns (see storage.read_columns)
+        """
+        types = self.get_types(request)
+        bounds = self.get_bounds(request)
+        if not types and not bounds:
+            return None
+        
+        mask = np.ones(len(columns['flowrate']), dtype=bool)
+        if types:
+            mask &= np.isin(columns['equipment_type'], types)
+        
+        for field, lookup, value in bounds:
+            if lookup == 'gte':
+                mask &= columns[field] >= value
+            else:
+                mask &= columns[field] <= value
+        return mask
+    
+    def filter_columns(self, request, columns):
+        """
+        Apply the same filters to a dict of column arrays.
+        
+        Args:
+            request: The incoming request
+            columns: Dict of equal-length columns (see storage.read_columns)
+            
+        Returns:
+            Dict of the selected rows of each column
+        """
+        mask = self.mask_columns(request, columns)
+        if mask is None or mask.all():
+            return columns
+        return {field: array[mask] for field, array in columns.items()}
+
+
+class RecordOrderingFilter(OrderingFilter):
+    """
+    Server-side sort for equipment records.
+    
+    Sorts by a single field and always ends the ordering with the primary
+    key in the same direction, which is the (value, id) keyset that
+    RecordCursorPagination pages through.
+    """
+    
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or ['id'])[:1]
+        if ordering[0].lstrip('-') != 'id':
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return ordering
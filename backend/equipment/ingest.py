@@ -0,0 +1,208 @@
+"""
+Asynchronous CSV ingestion.
+
+In async mode the upload view only spools the file to disk and creates a
+Dataset in the 'processing' state; process_upload() then runs the parse,
+validate, summarize and insert stages on the ingest pool and records
+progress on the Dataset row so clients can poll or stream it.
+
+Chunks are committed as they are inserted (so progress updates are
+visible to other connections); on failure the partial records are
+removed and the dataset is marked 'failed' with the error message.
+Ingests cut short by a restart are failed the same way by
+recover_interrupted_uploads(), run from the cleanup_datasets command.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Dataset, EquipmentRecord
+from .reports import prerender_report
+from .signals import invalidate_dataset_cache
+from .storage import default_storage, delete_columns, has_columns, open_column_writer
+from .tasks import run_ingest
+from .utils import CSVValidationError, ingest_csv_stream
+
+
+logger = logging.getLogger(__name__)
+
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+
+def spool_dir():
+    """Return the directory holding uploads waiting to be ingested."""
+    root = getattr(settings, 'EQUIPMENT_UPLOAD_SPOOL_ROOT', Path(settings.MEDIA_ROOT) / 'uploads')
+    return Path(root)
+
+
+def spool_upload(file, user):
+    """
+    Write an uploaded file to disk and create its 'processing' Dataset.
+    
+    Ingestion starts on the ingest pool once the current transaction
+    commits.
+    
+    Args:
+        file: Uploaded file
+        user: Uploading user, or None
+        
+    Returns:
+        The new Dataset
+    """
+    dataset = Dataset.objects.create(
+        user=user,
+        filename=file.name,
+        status=Dataset.PROCESSING,
+        progress=0,
+        storage=default_storage()
+    )
+    
+    path = spool_dir() / f'{dataset.pk}.csv'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as out:
+        for chunk in file.chunks(SPOOL_CHUNK_SIZE):
+            out.write(chunk)
+    
+    dataset_id = dataset.pk
+    transaction.on_commit(lambda: run_ingest(process_upload, dataset_id, str(path)))
+    return dataset
+
+
+def recover_interrupted_uploads(stale_after=None):
+    """
+    Fail uploads whose ingest was interrupted and remove orphaned spool files.
+    
+    A restart drops the ingest pool's queue and running work, leaving
+    datasets 'processing' forever and their spooled CSVs on disk. Datasets
+    still processing stale_after after the upload are marked 'failed' and
+    their partial records removed; spool files older than that with no
+    processing dataset are deleted.
+    
+    Args:
+        stale_after: timedelta, defaults to EQUIPMENT_STALE_TASK_SECONDS
+        
+    Returns:
+        (number of datasets failed, number of spool files removed)
+    """
+    if stale_after is None:
+        stale_after = timedelta(seconds=getattr(settings, 'EQUIPMENT_STALE_TASK_SECONDS', 60 * 60))
+    cutoff = timezone.now() - stale_after
+    
+    stale = list(Dataset.objects.filter(status=Dataset.PROCESSING, uploaded_at__lt=cutoff))
+    for dataset in stale:
+        records = EquipmentRecord.objects.filter(dataset_id=dataset.pk)
+        records._raw_delete(records.db)
+        if has_columns(dataset):
+            delete_columns(dataset)
+    failed = Dataset.objects.filter(pk__in=[d.pk for d in stale], status=Dataset.PROCESSING).update(
+        status=Dataset.FAILED,
+        error='Processing was interrupted before it finished; please upload the file again.'
+    )
+    
+    directory = spool_dir()
+    if not directory.is_dir():
+        return failed, 0
+    
+    processing = {str(pk) for pk in Dataset.objects.filter(status=Dataset.PROCESSING).values_list('pk', flat=True)}
+    removed = 0
+    for path in directory.iterdir():
+        # Recent files may belong to an upload whose transaction has not committed yet
+        if not path.is_file() or path.stem in processing or path.stat().st_mtime >= cutoff.timestamp():
+            continue
+        path.unlink(missing_ok=True)
+        removed += 1
+    return failed, removed
+
+
+def process_upload(dataset_id, path):
+    """
+    Ingest a spooled upload into its dataset, updating progress as chunks finish.
+    
+    Args:
+        dataset_id: Primary key of the 'processing' Dataset
+        path: Path of the spooled CSV file
+    """
+    try:
+        dataset = Dataset.objects.get(pk=dataset_id)
+    except Dataset.DoesNotExist:
+        os.unlink(path)
+        return
+    
+    size = os.path.getsize(path) or 1
+    progress = Dataset.objects.filter(pk=dataset_id)
+    
+    try:
+        with open(path, 'rb') as handle:
+            def on_chunk(rows):
+                # Bytes consumed by the parser; 100 is only set once the dataset is ready
+                progress.update(progress=min(99, handle.tell() * 100 // size))
+            
+            with open_column_writer(dataset) as writer:
+                summary = ingest_csv_stream(handle, dataset, column_writer=writer, on_chunk=on_chunk)
+    except Exception as e:
+        if not isinstance(e, (CSVValidationError, ValueError)):
+            logger.exception("Ingesting dataset %s failed", dataset_id)
+        records = EquipmentRecord.objects.filter(dataset_id=dataset_id)
+        records._raw_delete(records.db)
+        finish_upload(dataset, status=Dataset.FAILED, error=str(e))
+        return
+    finally:
+        # recover_interrupted_uploads() may have removed it from a stale ingest
+        Path(path).unlink(missing_ok=True)
+    
+    if not finish_upload(dataset, status=Dataset.READY, progress=100, **summary):
+        return
+    
+    Dataset.apply_retention(user=dataset.user)
+    
+    if getattr(settings, 'EQUIPMENT_PRERENDER_REPORTS', False):
+        prerender_report(dataset_id)
+
+
+def finish_upload(dataset, **fields):
+    """
+    Write the final state of an ingest to its dataset.
+    
+    Uses update() so that a dataset deleted while it was being ingested is
+    left alone instead of raising, and invalidates cached responses the way
+    the post_save handler would.
+    
+    Returns:
+        False if the dataset no longer exists
+    """
+    if not Dataset.objects.filter(pk=dataset.pk).update(**fields):
+        return False
+    for field, value in fields.items():
+        setattr(dataset, field, value)
+    invalidate_dataset_cache(Dataset, dataset)
+    return True
+
+
+def iter_progress_events(dataset_id, interval=0.5):
+    """
+    Yield Server-Sent Events with a dataset's ingestion progress.
+    
+    Polls the Dataset row every interval seconds, emits an event whenever
+    status or progress changes and stops once ingestion has finished (or
+    the dataset has been deleted).
+    """
+    last = None
+    while True:
+        state = Dataset.objects.filter(pk=dataset_id).values('status', 'progress', 'error').first()
+        if state is None:
+            yield 'event: deleted\ndata: {}\n\n'
+            return
+        if state != last:
+            yield f'data: {json.dumps(state)}\n\n'
+            last = state
+        if state['status'] != Dataset.PROCESSING:
+            return
+        time.sleep(interval)
@@ -0,0 +1,149 @@
+"""
+In-process job queue for heavy work such as PDF rendering.
+
+Jobs are rows in the Job table and run on the background thread pool
+from equipment.tasks, so a slow render occupies a pool thread instead of
+a WSGI worker. Clients enqueue a job, poll its status and fetch the
+result once it has succeeded.
+
+Handlers are registered per job kind with @register_job. They receive the
+Job and return a JSON-serialisable result; a result with a 'file' key is
+served as a file download by the result endpoint.
+
+The queue lives in memory, so the cleanup_datasets command fails jobs a
+restart left queued or running (recover_interrupted_jobs) and deletes
+finished jobs past their retention window (delete_expired_jobs).
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+from .reports import get_report
+from .tasks import run_in_background
+
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+
+def register_job(kind):
+    """Register a handler function for a job kind."""
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def enqueue_job(kind, dataset=None, user=None):
+    """
+    Create a job and start it once the current transaction commits.
+    
+    Args:
+        kind: Registered job kind
+        dataset: Dataset the job works on, if any
+        user: User who requested the job, if any
+        
+    Returns:
+        The queued Job
+        
+    Raises:
+        ValueError: If no handler is registered for kind
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    
+    job = Job.objects.create(kind=kind, dataset=dataset, user=user)
+    transaction.on_commit(lambda: run_in_background(run_job, job.pk))
+    return job
+
+
+def run_job(job_id):
+    """
+    Run a queued job and record its outcome.
+    
+    Status changes are written with update() so a job deleted while
+    running (together with its dataset) is not recreated.
+    """
+    jobs = Job.objects.filter(pk=job_id, status=Job.QUEUED)
+    if not jobs.update(status=Job.RUNNING, started_at=timezone.now()):
+        return
+    
+    job = Job.objects.select_related('dataset').get(pk=job_id)
+    try:
+        result = JOB_HANDLERS[job.kind](job)
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job_id, job.kind)
+        Job.objects.filter(pk=job_id).update(
+            status=Job.FAILED, error=str(e), finished_at=timezone.now()
+        )
+        return
+    
+    Job.objects.filter(pk=job_id).update(
+        status=Job.SUCCEEDED, result=result, finished_at=timezone.now()
+    )
+
+
+def recover_interrupted_jobs(stale_after=None):
+    """
+    Fail jobs still queued or running stale_after after they were created.
+    
+    They are failed rather than requeued: the process that finds them (such
+    as a management command) is not the one whose pool would run them.
+    
+    Args:
+        stale_after: timedelta, defaults to EQUIPMENT_STALE_TASK_SECONDS
+        
+    Returns:
+        Number of jobs failed
+    """
+    if stale_after is None:
+        stale_after = timedelta(seconds=getattr(settings, 'EQUIPMENT_STALE_TASK_SECONDS', 60 * 60))
+    return Job.objects.filter(
+        status__in=[Job.QUEUED, Job.RUNNING],
+        created_at__lt=timezone.now() - stale_after
+    ).update(
+        status=Job.FAILED,
+        error='Job was interrupted before it finished; please submit it again.',
+        finished_at=timezone.now()
+    )
+
+
+def delete_expired_jobs(max_age=None):
+    """
+    Delete finished jobs older than max_age.
+    
+    Only the Job rows go; report files belong to the report cache.
+    
+    Args:
+        max_age: timedelta, defaults to EQUIPMENT_JOB_MAX_AGE_HOURS
+        
+    Returns:
+        Number of jobs deleted
+    """
+    if max_age is None:
+        max_age = timedelta(hours=getattr(settings, 'EQUIPMENT_JOB_MAX_AGE_HOURS', 24))
+    deleted, _ = Job.objects.filter(
+        status__in=[Job.SUCCEEDED, Job.FAILED],
+        finished_at__lt=timezone.now() - max_age
+    ).delete()
+    return deleted
+
+
+@register_job('report')
+def render_report_job(job, full=False):
+    if job.dataset is None:
+        raise ValueError('Dataset not found')
+    path = get_report(job.dataset, full=full)
+    suffix = '_full' if full else ''
+    return {'file': str(path), 'filename': f'equipment_report_{job.dataset_id}{suffix}.pdf'}
+
+
+@register_job('full_report')
+def render_full_report_job(job):
+    return render_report_job(job, full=True)
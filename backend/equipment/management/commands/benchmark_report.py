@@ -0,0 +1,53 @@
+"""
+Benchmark full PDF report rendering on synthetic datasets.
+"""
+
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from equipment.models import Dataset
+from equipment.pdf_generator import generate_equipment_report
+from equipment.utils import calculate_summary, ingest_records
+
+from .benchmark_ingest import make_frame
+
+
+class Command(BaseCommand):
+    help = "Benchmark full PDF report rendering on synthetic data. Nothing is persisted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument(
+            '--trace-memory', action='store_true',
+            help="Report peak Python memory with tracemalloc (slows rendering down)"
+        )
+
+    def handle(self, *args, **options):
+        for rows in options['rows']:
+            df = make_frame(rows)
+            with transaction.atomic():
+                dataset = Dataset.objects.create(filename='benchmark.csv', **calculate_summary(df))
+                ingest_records(df, dataset)
+                
+                if options['trace_memory']:
+                    tracemalloc.start()
+                started = time.perf_counter()
+                buffer = generate_equipment_report(dataset, full=True)
+                seconds = time.perf_counter() - started
+                peak = None
+                if options['trace_memory']:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                
+                transaction.set_rollback(True)
+            
+            line = (
+                f"{rows:>8} rows  {seconds:8.3f}s  {rows / seconds:>10,.0f} rows/sec  "
+                f"{buffer.getbuffer().nbytes / 1e6:8.2f} MB pdf"
+            )
+            if peak is not None:
+                line += f"  {peak / 1e6:8.1f} MB peak"
+            self.stdout.write(line)
@@ -0,0 +1,53 @@
+"""
+Apply the dataset retention policy to every user, clean up after
+interrupted background work and expire finished jobs.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from equipment.ingest import recover_interrupted_uploads
+from equipment.jobs import delete_expired_jobs, recover_interrupted_jobs
+from equipment.models import Dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete datasets beyond each user's retention policy (count and age limits), "
+        "fail uploads and jobs interrupted by a restart, remove orphaned spool files "
+        "and delete expired jobs. "
+        "Run it on startup and periodically."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-after', type=int, default=None, metavar='SECONDS',
+            help="Treat uploads and jobs still in progress after this long as interrupted "
+                 "(default: EQUIPMENT_STALE_TASK_SECONDS). Use 0 on startup."
+        )
+    
+    def handle(self, *args, **options):
+        stale_after = options['stale_after']
+        if stale_after is not None:
+            stale_after = timedelta(seconds=stale_after)
+        
+        failed, removed = recover_interrupted_uploads(stale_after)
+        if failed or removed:
+            self.stdout.write(f"Failed {failed} interrupted upload(s), removed {removed} spool file(s)")
+        
+        failed = recover_interrupted_jobs(stale_after)
+        expired = delete_expired_jobs()
+        if failed or expired:
+            self.stdout.write(f"Failed {failed} interrupted job(s), deleted {expired} expired job(s)")
+        
+        owners = [None] + list(User.objects.filter(dataset__isnull=False).distinct())
+        total = 0
+        for user in owners:
+            deleted = Dataset.cleanup_old_datasets(user=user)
+            if deleted:
+                label = user.get_username() if user else 'anonymous'
+                self.stdout.write(f"{label}: deleted {deleted} dataset(s)")
+            total += deleted
+        self.stdout.write(self.style.SUCCESS(f"Deleted {total} dataset(s)"))
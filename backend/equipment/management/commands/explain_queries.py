@@ -0,0 +1,91 @@
+"""
+Print the query plans for the queries issued by the equipment API views.
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from equipment.export import EXPORT_FIELDS
+from equipment.models import Dataset, EquipmentRecord
+from equipment.pagination import RecordCursorPagination
+
+
+def view_queries(dataset, user):
+    """
+    Build the querysets the views run for a dataset and its owner.
+    
+    Returns:
+        List of (label, queryset) pairs
+    """
+    keep, _ = Dataset.retention_policy(user)
+    if user is not None:
+        owned = Dataset.objects.filter(user=user)
+    else:
+        owned = Dataset.objects.filter(user__isnull=True)
+    records = EquipmentRecord.objects.filter(dataset=dataset)
+    # page_size + 1 rows: the extra one tells whether there is a next page
+    limit = RecordCursorPagination.page_size + 1
+    # Cursor at the first record (any position gives the same plan)
+    first = records.order_by('id').first()
+    flowrate, first_id = (first.flowrate, first.pk) if first is not None else (0.0, 0)
+    
+    return [
+        ('history_etag: listed dataset states', owned.order_by('-uploaded_at').values_list('id', 'uploaded_at', 'status', 'progress')[:keep]),
+        ('HistoryView: datasets with record counts', owned.annotate(records_count=Count('records'))[:keep]),
+        ('cleanup_old_datasets: expired ids', owned.order_by('-uploaded_at').values_list('pk', flat=True)[keep:]),
+        ('dataset_etag: dataset state', Dataset.objects.filter(pk=dataset.pk).values_list('uploaded_at', 'status', 'progress')),
+        ('Summary/Data/Report views: dataset lookup', Dataset.objects.filter(pk=dataset.pk)),
+        ('DatasetSerializer: records count', records.values('dataset').annotate(n=Count('id'))),
+        ('DatasetDataView: first page', records.order_by('id')[:limit]),
+        ('DatasetDataView: next page', records.filter(cursor_after('id', first_id, first_id)).order_by('id')[:limit]),
+        ('DatasetDataView: type filter', records.filter(equipment_type=dataset_type(dataset)).order_by('id')[:limit]),
+        ('DatasetDataView: sorted by flowrate', records.order_by('-flowrate', '-id')[:limit]),
+        ('DatasetDataView: next page sorted by flowrate', records.filter(cursor_after('-flowrate', flowrate, first_id)).order_by('-flowrate', '-id')[:limit]),
+        ('DatasetExportView: record cursor', records.order_by('id').values_list(*EXPORT_FIELDS)),
+        ('delete_datasets: record delete scope', EquipmentRecord.objects.filter(dataset_id__in=[dataset.pk])),
+    ]
+
+
+def cursor_after(ordering, value, last_id):
+    """Return the filter RecordCursorPagination applies for a cursor at (value, last_id)."""
+    paginator = RecordCursorPagination()
+    paginator.field = ordering.lstrip('-')
+    paginator.descending = ordering.startswith('-')
+    return paginator.after(value, last_id)
+
+
+def dataset_type(dataset):
+    """Return one equipment type present in the dataset, for the type filter plan."""
+    return next(iter(dataset.type_distribution), '')
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN every query issued by the equipment API views, to check index use."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', type=int, help="Dataset id to explain against (default: newest)")
+        parser.add_argument('--analyze', action='store_true', help="Run EXPLAIN ANALYZE (PostgreSQL only)")
+
+    def handle(self, *args, **options):
+        if options['dataset']:
+            dataset = Dataset.objects.filter(pk=options['dataset']).first()
+        else:
+            dataset = Dataset.objects.first()
+        if dataset is None:
+            raise CommandError("No dataset found. Upload a CSV first or pass --dataset.")
+        
+        user = User.objects.filter(pk=dataset.user_id).first()
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor != 'postgresql':
+                raise CommandError("--analyze is only supported on PostgreSQL.")
+            explain_options['analyze'] = True
+        
+        self.stdout.write(f"Database: {connection.vendor}, dataset {dataset.pk} ({dataset.filename})\n")
+        for label, queryset in view_queries(dataset, user):
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write('')
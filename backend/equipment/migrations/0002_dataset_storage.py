@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='storage',
+            field=models.CharField(choices=[('rows', 'Record rows'), ('columns', 'Column files'), ('both', 'Record rows and column files')], default='rows', max_length=10),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0002_dataset_storage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dataset',
+            index=models.Index(fields=['user', '-uploaded_at'], name='dataset_user_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentrecord',
+            index=models.Index(fields=['dataset', 'equipment_type'], name='record_dataset_type_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0004_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=100),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='status',
+            field=models.CharField(choices=[('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=10),
+        ),
+    ]
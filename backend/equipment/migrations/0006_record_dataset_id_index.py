@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0005_dataset_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipmentrecord',
+            index=models.Index(fields=['dataset', 'id'], name='record_dataset_id_idx'),
+        ),
+        migrations.AlterField(
+            model_name='equipmentrecord',
+            name='dataset',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='records', to='equipment.dataset'),
+        ),
+    ]
@@ -1,12 +1,29 @@
-from django.db import models
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .storage import STORAGE_CHOICES, ROWS
 
 
 class Dataset(models.Model):
     """
     Represents an uploaded CSV dataset with calculated summary statistics.
-    Only the last 5 datasets are kept in the system.
+    How many datasets are kept, per user and by age, is set by the
+    EQUIPMENT_RETENTION setting (see retention_policy).
     """
+    PROCESSING = 'processing'
+    READY = 'ready'
+    FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (PROCESSING, 'Processing'),
+        (READY, 'Ready'),
+        (FAILED, 'Failed'),
+    ]
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     filename = models.CharField(max_length=255)
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -20,35 +37,171 @@ class Dataset(models.Model):
     # Equipment type distribution stored as JSON
     type_distribution = models.JSONField(default=dict)
     
+    # Where the equipment records live (see equipment.storage)
+    storage = models.CharField(max_length=10, choices=STORAGE_CHOICES, default=ROWS)
+    
+    # Asynchronous uploads are 'processing' until the background ingest finishes
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=READY)
+    progress = models.PositiveSmallIntegerField(default=100)
+    error = models.TextField(blank=True)
+    
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # History listing and retention cleanup filter by user and sort newest first
+            models.Index(fields=['user', '-uploaded_at'], name='dataset_user_uploaded_idx'),
+        ]
     
     def __str__(self):
         return f"{self.filename} - {self.uploaded_at.strftime('%Y-%m-%d %H:%M')}"
     
+    @property
+    def is_ready(self):
+        return self.status == self.READY
+    
+    @classmethod
+    def retention_policy(cls, user=None):
+        """
+        Return (keep, max_age) for a user from the EQUIPMENT_RETENTION setting.
+        
+        keep is the number of most recent datasets kept for the user (or for
+        anonymous uploads); max_age is a timedelta, or None for no age limit.
+        """
+        policy = getattr(settings, 'EQUIPMENT_RETENTION', {})
+        keep = policy.get('KEEP', 5)
+        if user is not None:
+            keep = policy.get('KEEP_PER_USER', {}).get(user.get_username(), keep)
+        max_age_days = policy.get('MAX_AGE_DAYS')
+        max_age = timedelta(days=max_age_days) if max_age_days is not None else None
+        return keep, max_age
+    
     @classmethod
-    def cleanup_old_datasets(cls, user=None, keep=5):
-        """Keep only the last N datasets per user (or global if no user)."""
+    def cleanup_old_datasets(cls, user=None, keep=None, max_age=None):
+        """
+        Keep only the last N datasets per user (or global if no user).
+        
+        Datasets older than max_age are removed as well. Both limits default
+        to the user's retention policy. Datasets still being ingested are
+        neither counted nor deleted.
+        
+        Returns:
+            Number of datasets deleted
+        """
+        policy_keep, policy_max_age = cls.retention_policy(user)
+        keep = policy_keep if keep is None else keep
+        max_age = policy_max_age if max_age is None else max_age
+        
         if user:
             datasets = cls.objects.filter(user=user).order_by('-uploaded_at')
         else:
             datasets = cls.objects.filter(user__isnull=True).order_by('-uploaded_at')
+        datasets = datasets.exclude(status=cls.PROCESSING)
+        
+        expired = set(datasets.values_list('pk', flat=True)[keep:])
+        if max_age is not None:
+            cutoff = timezone.now() - max_age
+            expired.update(datasets.filter(uploaded_at__lt=cutoff).values_list('pk', flat=True))
+        
+        return cls.delete_datasets(expired)
+    
+    @classmethod
+    def apply_retention(cls, user=None):
+        """
+        Run cleanup_old_datasets for a user, in the background when
+        EQUIPMENT_RETENTION['DEFERRED'] is set.
+        
+        Deferred cleanup starts after the current transaction commits.
+        """
+        if not getattr(settings, 'EQUIPMENT_RETENTION', {}).get('DEFERRED', False):
+            cls.cleanup_old_datasets(user=user)
+            return
         
-        to_delete = datasets[keep:]
-        for dataset in to_delete:
-            dataset.delete()
+        from .tasks import run_in_background
+        transaction.on_commit(lambda: run_in_background(cls.cleanup_old_datasets, user=user))
+    
+    @classmethod
+    def delete_datasets(cls, ids):
+        """
+        Delete datasets and their records with set-based queries.
+        
+        Records are removed with a single DELETE instead of being loaded by
+        the deletion collector; the datasets themselves are then deleted
+        normally so post_delete handlers still run.
+        
+        Returns:
+            Number of datasets deleted
+        """
+        ids = list(ids)
+        if not ids:
+            return 0
+        
+        with transaction.atomic():
+            records = EquipmentRecord.objects.filter(dataset_id__in=ids)
+            records._raw_delete(records.db)
+            _, deleted = cls.objects.filter(pk__in=ids).delete()
+        return deleted.get(cls._meta.label, 0)
 
 
 class EquipmentRecord(models.Model):
     """
     Individual equipment record from a CSV upload.
     """
-    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, related_name='records')
+    # Indexed by the composite indexes below instead of on its own
+    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, related_name='records', db_index=False)
     equipment_name = models.CharField(max_length=255)
     equipment_type = models.CharField(max_length=100)
     flowrate = models.FloatField()
     pressure = models.FloatField()
     temperature = models.FloatField()
     
+    class Meta:
+        indexes = [
+            # Records are always reached through their dataset, often filtered by type
+            models.Index(fields=['dataset', 'equipment_type'], name='record_dataset_type_idx'),
+            # Cursor pages and exports walk a dataset in id order without sorting it
+            models.Index(fields=['dataset', 'id'], name='record_dataset_id_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.equipment_name} ({self.equipment_type})"
+
+
+class Job(models.Model):
+    """
+    A unit of heavy work (such as rendering a PDF report) run on the
+    background pool instead of inside a request. See equipment.jobs.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+    
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs')
+    
+    # Handler output, e.g. {'file': ..., 'filename': ...} for report jobs
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.kind} job {self.pk} ({self.status})"
+    
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
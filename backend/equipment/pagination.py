@@ -0,0 +1,196 @@
+"""
+Pagination classes for equipment API endpoints.
+"""
+
+import json
+from base64 import b64decode, b64encode
+from urllib import parse
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class RecordCursorPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination over a dataset's equipment records.
+    
+    The cursor holds the (sort value, id) of the row at the edge of the
+    page, and the next page is fetched with
+    
+        WHERE field > value OR (field = value AND id > last_id)
+    
+    (inverted for descending orderings and for previous links) instead of
+    an OFFSET. Unlike DRF's CursorPagination, whose position is the sort
+    value alone plus a capped offset within ties, this stays correct when
+    any number of rows share the sort value, and the cost of a page does
+    not depend on how deep it is.
+    
+    Expects an ordering of (field, id) with both in the same direction, as
+    produced by RecordOrderingFilter. paginate_columns applies the same
+    cursors to datasets stored as column files only.
+    """
+    page_size = getattr(settings, 'EQUIPMENT_RECORDS_PAGE_SIZE', 1000)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'EQUIPMENT_RECORDS_MAX_PAGE_SIZE', 10000)
+    ordering = 'id'
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.field = self.ordering[0].lstrip('-')
+        self.descending = self.ordering[0].startswith('-')
+        
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor[2]
+        
+        if self.cursor is not None:
+            value, last_id, _ = self.cursor
+            queryset = queryset.filter(self.after(value, last_id, reverse))
+        
+        ordering = self.ordering
+        if reverse:
+            ordering = [o[1:] if o.startswith('-') else f'-{o}' for o in ordering]
+        
+        # One extra row tells whether there is another page in this direction
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        
+        if reverse:
+            rows.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        
+        self.page = rows
+        return self.page
+    
+    def paginate_columns(self, columns, request, mask=None, view=None):
+        """
+        Page through column arrays (see storage.read_columns).
+        
+        Column files have no record ids, so 1-based row positions stand in
+        for them. Only the page's equipment names are decoded, unless the
+        records are sorted by name.
+        
+        Args:
+            columns: Dict of equal-length columns
+            request: The incoming request
+            mask: Boolean mask of the rows to include, or None for all
+            view: The view, whose ordering filter picks the sort field
+            
+        Returns:
+            List of record dicts with the EquipmentRecordSerializer fields
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, None, view)
+        self.field = self.ordering[0].lstrip('-')
+        self.descending = self.ordering[0].startswith('-')
+        
+        ids = np.arange(1, len(columns['flowrate']) + 1)
+        if mask is not None:
+            ids = ids[mask]
+        if self.field == 'id':
+            keys = ids
+        else:
+            keys = np.asarray(columns[self.field][ids - 1])
+            if keys.dtype == object:
+                keys = keys.astype(str)
+        
+        order = np.lexsort((ids, keys))
+        if self.descending:
+            order = order[::-1]
+        keys, ids = keys[order], ids[order]
+        
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor[2]
+        
+        selected = np.arange(len(ids))
+        if self.cursor is not None:
+            value, last_id, _ = self.cursor
+            if self.descending != reverse:
+                past = (keys < value) | ((keys == value) & (ids < last_id))
+            else:
+                past = (keys > value) | ((keys == value) & (ids > last_id))
+            selected = np.flatnonzero(past)
+        
+        # Rows past the cursor are a suffix of the sorted order (a prefix when walking back)
+        if reverse:
+            chunk = selected[-(self.page_size + 1):]
+            has_more = len(chunk) > self.page_size
+            chunk = chunk[-self.page_size:]
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            chunk = selected[:self.page_size + 1]
+            has_more = len(chunk) > self.page_size
+            chunk = chunk[:self.page_size]
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        
+        positions = ids[chunk] - 1
+        values = {field: columns[field][positions].tolist() for field in columns}
+        self.page = [
+            dict({'id': int(pk)}, **{field: values[field][i] for field in values})
+            for i, pk in enumerate(ids[chunk])
+        ]
+        return self.page
+    
+    def after(self, value, last_id, reverse=False):
+        """Return the Q selecting rows past (value, last_id) in the walk direction."""
+        op = 'lt' if self.descending != reverse else 'gt'
+        if self.field == 'id':
+            return Q(**{f'id__{op}': last_id})
+        return Q(**{f'{self.field}__{op}': value}) | Q(**{self.field: value, f'id__{op}': last_id})
+    
+    def position(self, record):
+        if isinstance(record, dict):
+            return record[self.field], record['id']
+        return getattr(record, self.field), record.id
+    
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.position(self.page[-1]) + (False,))
+    
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.position(self.page[0]) + (True,))
+    
+    def decode_cursor(self, request):
+        """Return (value, id, reverse) from the cursor query parameter, or None."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            value = json.loads(tokens['p'][0])
+            last_id = int(tokens['i'][0])
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        
+        return value, last_id, reverse
+    
+    def encode_cursor(self, cursor):
+        value, last_id, reverse = cursor
+        tokens = {'p': json.dumps(value), 'i': str(last_id)}
+        if reverse:
+            tokens['r'] = '1'
+        
+        querystring = parse.urlencode(tokens)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
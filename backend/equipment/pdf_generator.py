@@ -1,7 +1,13 @@
 """
 PDF Report Generator for Equipment Data.
+
+Paragraph and table styles are built once per process by
+get_report_styles() and shared by every report. A report's content is
+defined by a ReportLayout; layouts are registered by name, so new report
+types can reuse the styles and sections of the standard one.
 """
 
+import threading
 from io import BytesIO
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
@@ -10,147 +16,300 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from datetime import datetime
+from django.conf import settings
+
+from .charts import chart_png
+from .storage import COLUMN_FIELDS, column_rows, has_columns, read_columns, iter_column_rows
+
+
+# Records shown in the default report; full reports include every record
+PREVIEW_ROWS = 50
+
+RECORD_HEADER = ['Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+RECORD_COL_WIDTHS = [1.5*inch, 1.2*inch, 0.9*inch, 0.9*inch, 1*inch]
+
+REPORT_CHARTS = ['type_distribution', 'parameter_averages']
+CHART_WIDTH = 3.1*inch
+CHART_HEIGHT = CHART_WIDTH * 3 / 4
+
+DEFAULT_LAYOUT = 'standard'
+
+
+def data_table_style(header_color, body_color, grid_color, header_size=12, body_size=10, padding=8):
+    """Return the TableStyle shared by the report's data tables."""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(header_color)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), header_size),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), header_size),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor(body_color)),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor(grid_color)),
+        ('FONTSIZE', (0, 1), (-1, -1), body_size),
+        ('TOPPADDING', (0, 1), (-1, -1), padding),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), padding),
+    ])
 
 
-def generate_equipment_report(dataset):
+class ReportStyles:
+    """Paragraph and table styles used by report layouts."""
+    
+    def __init__(self):
+        sample = getSampleStyleSheet()
+        
+        self.title = ParagraphStyle(
+            'CustomTitle',
+            parent=sample['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#1a365d')
+        )
+        
+        self.heading = ParagraphStyle(
+            'CustomHeading',
+            parent=sample['Heading2'],
+            fontSize=14,
+            spaceBefore=20,
+            spaceAfter=10,
+            textColor=colors.HexColor('#2d3748')
+        )
+        
+        self.normal = sample['Normal']
+        
+        self.summary_table = data_table_style('#4299e1', '#f7fafc', '#e2e8f0')
+        self.type_table = data_table_style('#48bb78', '#f0fff4', '#c6f6d5')
+        self.records_table = data_table_style('#805ad5', '#faf5ff', '#e9d8fd', header_size=10, body_size=8, padding=6)
+        self.records_table.add('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#faf5ff'), colors.white])
+
+
+_styles = None
+_styles_lock = threading.Lock()
+
+
+def get_report_styles():
     """
-    Generate a PDF report for the given dataset.
+    Return the process-wide ReportStyles, building them on first use.
+    
+    Styles are only read while rendering, so one instance is shared by all
+    threads.
+    """
+    global _styles
+    if _styles is None:
+        with _styles_lock:
+            if _styles is None:
+                _styles = ReportStyles()
+    return _styles
+
+
+REPORT_LAYOUTS = {}
+
+
+def register_layout(cls):
+    """Class decorator registering a ReportLayout subclass under its name."""
+    REPORT_LAYOUTS[cls.name] = cls()
+    return cls
+
+
+def get_layout(name=DEFAULT_LAYOUT):
+    """
+    Return a registered report layout.
+    
+    Raises:
+        ValueError: If no layout is registered under name
+    """
+    try:
+        return REPORT_LAYOUTS[name]
+    except KeyError:
+        raise ValueError(f'Unknown report layout: {name}')
+
+
+def iter_report_rows(dataset):
+    """
+    Lazily yield every record of a dataset as (name, type, flowrate, pressure, temperature).
+    
+    Rows come from the column files when present, otherwise from a
+    server-side values_list iterator, so the records are never all
+    loaded as model instances.
+    """
+    if has_columns(dataset):
+        yield from iter_column_rows(read_columns(dataset))
+        return
+    
+    chunk_size = getattr(settings, 'EQUIPMENT_EXPORT_CHUNK_SIZE', 2000)
+    yield from dataset.records.order_by('id').values_list(*COLUMN_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def record_tables(rows, style, chunk_size=None):
+    """
+    Build records Table flowables of at most chunk_size rows each.
+    
+    Many small tables lay out in linear time, where ReportLab splitting
+    one huge table across pages does not. Each chunk repeats the header
+    row when it breaks across a page.
     
     Args:
-        dataset: Dataset model instance with related records
+        rows: Iterable of (name, type, flowrate, pressure, temperature)
+        style: TableStyle applied to every chunk
+        chunk_size: Rows per table (EQUIPMENT_REPORT_TABLE_ROWS by default)
         
     Returns:
-        BytesIO buffer containing the PDF data
+        List of Table flowables
     """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
-    
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#1a365d')
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceBefore=20,
-        spaceAfter=10,
-        textColor=colors.HexColor('#2d3748')
-    )
-    
-    normal_style = styles['Normal']
-    
-    # Build document content
-    story = []
-    
-    # Title
-    story.append(Paragraph("Chemical Equipment Analysis Report", title_style))
-    story.append(Spacer(1, 12))
-    
-    # File info
-    story.append(Paragraph(f"<b>File:</b> {dataset.filename}", normal_style))
-    story.append(Paragraph(f"<b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", normal_style))
-    story.append(Paragraph(f"<b>Upload Date:</b> {dataset.uploaded_at.strftime('%Y-%m-%d %H:%M:%S')}", normal_style))
-    story.append(Spacer(1, 20))
-    
-    # Summary Statistics Section
-    story.append(Paragraph("Summary Statistics", heading_style))
-    
-    summary_data = [
-        ['Metric', 'Value'],
-        ['Total Equipment Count', str(dataset.total_count)],
-        ['Average Flowrate', f"{dataset.avg_flowrate:.2f} L/min"],
-        ['Average Pressure', f"{dataset.avg_pressure:.2f} bar"],
-        ['Average Temperature', f"{dataset.avg_temperature:.2f} °C"],
-    ]
-    
-    summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4299e1')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f7fafc')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e2e8f0')),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('TOPPADDING', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-    ]))
-    story.append(summary_table)
-    story.append(Spacer(1, 20))
-    
-    # Type Distribution Section
-    story.append(Paragraph("Equipment Type Distribution", heading_style))
-    
-    type_data = [['Equipment Type', 'Count']]
-    for eq_type, count in dataset.type_distribution.items():
-        type_data.append([eq_type, str(count)])
-    
-    type_table = Table(type_data, colWidths=[3*inch, 2*inch])
-    type_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#48bb78')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f0fff4')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#c6f6d5')),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('TOPPADDING', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-    ]))
-    story.append(type_table)
-    story.append(Spacer(1, 20))
-    
-    # Equipment Data Table
-    story.append(Paragraph("Equipment Records", heading_style))
-    
-    records = dataset.records.all()
-    if records.exists():
-        eq_data = [['Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']]
-        for record in records[:50]:  # Limit to 50 records for PDF
-            eq_data.append([
-                record.equipment_name,
-                record.equipment_type,
-                f"{record.flowrate:.1f}",
-                f"{record.pressure:.1f}",
-                f"{record.temperature:.1f}"
-            ])
+    chunk_size = chunk_size or getattr(settings, 'EQUIPMENT_REPORT_TABLE_ROWS', 500)
+    tables = []
+    chunk = [RECORD_HEADER]
+    
+    def flush():
+        table = Table(chunk, colWidths=RECORD_COL_WIDTHS, repeatRows=1)
+        table.setStyle(style)
+        tables.append(table)
+    
+    for name, eq_type, flowrate, pressure, temperature in rows:
+        chunk.append([name, eq_type, f"{flowrate:.1f}", f"{pressure:.1f}", f"{temperature:.1f}"])
+        if len(chunk) > chunk_size:
+            flush()
+            chunk = [RECORD_HEADER]
+    
+    if len(chunk) > 1:
+        flush()
+    return tables
+
+
+class ReportLayout:
+    """
+    Base class for report layouts.
+    
+    A layout lists its sections; each section appends flowables for a
+    dataset to the story. Layouts hold no per-report state, so the
+    registered instances are shared between threads. Subclass, override
+    sections() (or individual sections) and decorate with
+    @register_layout to add a report type.
+    """
+    name = None
+    title = "Chemical Equipment Analysis Report"
+    
+    def sections(self):
+        return [self.add_header, self.add_summary, self.add_type_distribution, self.add_charts, self.add_records]
+    
+    def build_story(self, dataset, full=False):
+        styles = get_report_styles()
+        story = []
+        for section in self.sections():
+            section(story, dataset, styles, full)
+        return story
+    
+    def render(self, dataset, full=False):
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
+        doc.build(self.build_story(dataset, full))
+        buffer.seek(0)
+        return buffer
+    
+    def add_header(self, story, dataset, styles, full):
+        # Title
+        story.append(Paragraph(self.title, styles.title))
+        story.append(Spacer(1, 12))
+        
+        # File info
+        story.append(Paragraph(f"<b>File:</b> {dataset.filename}", styles.normal))
+        story.append(Paragraph(f"<b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles.normal))
+        story.append(Paragraph(f"<b>Upload Date:</b> {dataset.uploaded_at.strftime('%Y-%m-%d %H:%M:%S')}", styles.normal))
+        story.append(Spacer(1, 20))
+    
+    def add_summary(self, story, dataset, styles, full):
+        story.append(Paragraph("Summary Statistics", styles.heading))
+        
+        summary_data = [
+            ['Metric', 'Value'],
+            ['Total Equipment Count', str(dataset.total_count)],
+            ['Average Flowrate', f"{dataset.avg_flowrate:.2f} L/min"],
+            ['Average Pressure', f"{dataset.avg_pressure:.2f} bar"],
+            ['Average Temperature', f"{dataset.avg_temperature:.2f} °C"],
+        ]
+        
+        summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
+        summary_table.setStyle(styles.summary_table)
+        story.append(summary_table)
+        story.append(Spacer(1, 20))
+    
+    def add_type_distribution(self, story, dataset, styles, full):
+        story.append(Paragraph("Equipment Type Distribution", styles.heading))
+        
+        type_data = [['Equipment Type', 'Count']]
+        for eq_type, count in dataset.type_distribution.items():
+            type_data.append([eq_type, str(count)])
+        
+        type_table = Table(type_data, colWidths=[3*inch, 2*inch])
+        type_table.setStyle(styles.type_table)
+        story.append(type_table)
+        story.append(Spacer(1, 20))
+    
+    def add_charts(self, story, dataset, styles, full):
+        images = []
+        for name in REPORT_CHARTS:
+            png = chart_png(name, dataset)
+            if png is None:
+                return
+            images.append(Image(BytesIO(png), width=CHART_WIDTH, height=CHART_HEIGHT))
+        
+        story.append(Paragraph("Charts", styles.heading))
+        story.append(Table([images], colWidths=[CHART_WIDTH] * len(images)))
+        story.append(Spacer(1, 20))
+    
+    def add_records(self, story, dataset, styles, full):
+        story.append(Paragraph("Equipment Records", styles.heading))
+        
+        if full:
+            story.extend(record_tables(iter_report_rows(dataset), styles.records_table))
+            return
+        
+        if has_columns(dataset):
+            record_count = column_rows(dataset)
+            rows = list(iter_column_rows(read_columns(dataset, stop=PREVIEW_ROWS)))
+        else:
+            records = dataset.records.all()
+            record_count = records.count()
+            rows = list(records.values_list(*COLUMN_FIELDS)[:PREVIEW_ROWS])
         
         # Add note if truncated
-        if records.count() > 50:
-            story.append(Paragraph(f"<i>Showing first 50 of {records.count()} records</i>", normal_style))
+        if record_count > PREVIEW_ROWS:
+            story.append(Paragraph(f"<i>Showing first {PREVIEW_ROWS} of {record_count} records</i>", styles.normal))
             story.append(Spacer(1, 10))
         
-        eq_table = Table(eq_data, colWidths=[1.5*inch, 1.2*inch, 0.9*inch, 0.9*inch, 1*inch])
-        eq_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#805ad5')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#faf5ff')),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e9d8fd')),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#faf5ff'), colors.white]),
-        ]))
-        story.append(eq_table)
-    
-    # Build PDF
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+        story.extend(record_tables(rows, styles.records_table))
+
+
+@register_layout
+class StandardReportLayout(ReportLayout):
+    """Summary, type distribution and records table."""
+    name = DEFAULT_LAYOUT
+
+
+@register_layout
+class SummaryReportLayout(ReportLayout):
+    """Summary statistics and type distribution only, without records."""
+    name = 'summary'
+    title = "Chemical Equipment Summary Report"
+    
+    def sections(self):
+        return [self.add_header, self.add_summary, self.add_type_distribution, self.add_charts]
+
+
+def generate_equipment_report(dataset, full=False, layout=DEFAULT_LAYOUT):
+    """
+    Generate a PDF report for the given dataset.
+    
+    Args:
+        dataset: Dataset model instance with related records
+        full: Include every record instead of the first PREVIEW_ROWS
+        layout: Name of a registered ReportLayout
+        
+    Returns:
+        BytesIO buffer containing the PDF data
+        
+    Raises:
+        ValueError: If the layout is not registered
+    """
+    return get_layout(layout).render(dataset, full=full)
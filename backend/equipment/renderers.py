@@ -0,0 +1,58 @@
+"""
+Columnar binary renderers for equipment records.
+
+pyarrow is imported when a response is rendered, so the rest of the API
+keeps working on installs without it.
+"""
+
+from io import BytesIO
+
+from rest_framework.renderers import BaseRenderer
+
+
+def to_arrow_table(data, renderer_context=None):
+    """
+    Convert response data to a pyarrow Table.
+    
+    Successful responses carry a dict of equal-length column arrays. Error
+    responses carry a flat dict of messages, which becomes a one-row table.
+    """
+    import pyarrow as pa
+    
+    response = (renderer_context or {}).get('response')
+    if response is not None and response.status_code >= 400:
+        return pa.table({key: [str(value)] for key, value in data.items()})
+    return pa.table(data)
+
+
+class ArrowStreamRenderer(BaseRenderer):
+    """Render record columns as an Apache Arrow IPC stream."""
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import pyarrow as pa
+        
+        table = to_arrow_table(data, renderer_context)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+class ParquetRenderer(BaseRenderer):
+    """Render record columns as a zstd-compressed Parquet file."""
+    media_type = 'application/vnd.apache.parquet'
+    format = 'parquet'
+    charset = None
+    render_style = 'binary'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import pyarrow.parquet as pq
+        
+        table = to_arrow_table(data, renderer_context)
+        buffer = BytesIO()
+        pq.write_table(table, buffer, compression='zstd')
+        return buffer.getvalue()
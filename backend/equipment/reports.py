@@ -0,0 +1,134 @@
+"""
+On-disk cache of generated PDF reports.
+
+Datasets never change after upload, so a report only has to be rendered
+once. Files are named after the dataset id and a hash of everything the
+report is built from; REPORT_VERSION is part of the hash and should be
+bumped whenever pdf_generator changes the layout.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import Dataset
+from .pdf_generator import DEFAULT_LAYOUT, generate_equipment_report, get_layout
+
+
+logger = logging.getLogger(__name__)
+
+REPORT_VERSION = 2
+
+_render_locks = {}
+_render_locks_guard = threading.Lock()
+
+
+def report_dir():
+    """Return the directory holding cached reports."""
+    root = getattr(settings, 'EQUIPMENT_REPORT_CACHE_ROOT', Path(settings.MEDIA_ROOT) / 'reports')
+    return Path(root)
+
+
+def report_hash(dataset, full=False, layout=DEFAULT_LAYOUT):
+    """Return a hash identifying the contents of a dataset's report."""
+    content = {
+        'version': REPORT_VERSION,
+        'full': full,
+        'layout': layout,
+        'id': dataset.pk,
+        'filename': dataset.filename,
+        'uploaded_at': dataset.uploaded_at.isoformat(),
+        'total_count': dataset.total_count,
+        'avg_flowrate': dataset.avg_flowrate,
+        'avg_pressure': dataset.avg_pressure,
+        'avg_temperature': dataset.avg_temperature,
+        'type_distribution': dataset.type_distribution,
+        'storage': dataset.storage,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+
+
+def report_path(dataset, full=False, layout=DEFAULT_LAYOUT):
+    return report_dir() / f'{dataset.pk}-{report_hash(dataset, full, layout)}.pdf'
+
+
+def get_render_lock(path):
+    with _render_locks_guard:
+        return _render_locks.setdefault(path, threading.Lock())
+
+
+def get_report(dataset, full=False, layout=DEFAULT_LAYOUT):
+    """
+    Return the path of a dataset's PDF report, rendering it if needed.
+    
+    Concurrent requests for the same report in this process wait for a
+    single render. The file is written under a temporary name and moved
+    into place, so readers never see a partial PDF.
+    
+    Args:
+        dataset: Dataset model instance
+        full: Render every record instead of the preview table
+        layout: Name of a registered report layout
+        
+    Returns:
+        Path to the cached PDF file
+        
+    Raises:
+        ValueError: If the layout is not registered
+    """
+    get_layout(layout)
+    path = report_path(dataset, full, layout)
+    if path.exists():
+        return path
+    
+    with get_render_lock(path):
+        if path.exists():
+            return path
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        buffer = generate_equipment_report(dataset, full=full, layout=layout)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(buffer.getbuffer())
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    
+    with _render_locks_guard:
+        _render_locks.pop(path, None)
+    return path
+
+
+def prerender_report(dataset_id):
+    """Render and cache a dataset's report (run on the background pool after upload)."""
+    try:
+        dataset = Dataset.objects.get(pk=dataset_id)
+    except Dataset.DoesNotExist:
+        # Removed by retention before the task ran
+        return None
+    path = get_report(dataset)
+    logger.info("Pre-rendered report for dataset %s", dataset_id)
+    return path
+
+
+def delete_reports(dataset):
+    """Remove every cached report of a dataset."""
+    for path in report_dir().glob(f'{dataset.pk}-*.pdf'):
+        path.unlink(missing_ok=True)
+
+
+def render_report_file(dataset_id, full=False, layout=DEFAULT_LAYOUT):
+    """
+    Render a report by dataset id and return its path as a string.
+    
+    Takes and returns plain values so it can run on the process pool.
+    """
+    return str(get_report(Dataset.objects.get(pk=dataset_id), full=full, layout=layout))
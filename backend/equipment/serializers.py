@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Dataset, EquipmentRecord
+from .models import Dataset, EquipmentRecord, Job
+from .storage import has_rows
 
 
 class EquipmentRecordSerializer(serializers.ModelSerializer):
@@ -20,23 +21,28 @@ class DatasetSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'filename', 'uploaded_at', 'total_count',
             'avg_flowrate', 'avg_pressure', 'avg_temperature',
-            'type_distribution', 'records_count'
+            'type_distribution', 'records_count',
+            'status', 'progress', 'error'
         ]
     
     def get_records_count(self, obj):
+        if not has_rows(obj):
+            return obj.total_count
+        # List views annotate records_count to avoid one COUNT query per dataset
+        records_count = getattr(obj, 'records_count', None)
+        if records_count is not None:
+            return records_count
         return obj.records.count()
 
 
-class DatasetDetailSerializer(serializers.ModelSerializer):
-    """Detailed serializer including all equipment records."""
-    records = EquipmentRecordSerializer(many=True, read_only=True)
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for background job status."""
     
     class Meta:
-        model = Dataset
+        model = Job
         fields = [
-            'id', 'filename', 'uploaded_at', 'total_count',
-            'avg_flowrate', 'avg_pressure', 'avg_temperature',
-            'type_distribution', 'records'
+            'id', 'kind', 'status', 'dataset', 'error',
+            'created_at', 'started_at', 'finished_at'
         ]
 
 
@@ -0,0 +1,38 @@
+"""
+Signal handlers for the equipment app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import bump_version
+from .models import Dataset
+from .reports import delete_reports
+from .storage import has_columns, delete_columns
+
+
+@receiver(post_delete, sender=Dataset)
+def remove_dataset_columns(sender, instance, **kwargs):
+    """Delete the column files of a dataset once its row is gone."""
+    if has_columns(instance):
+        delete_columns(instance)
+
+
+@receiver(post_delete, sender=Dataset)
+def remove_dataset_reports(sender, instance, **kwargs):
+    """Delete cached PDF reports of a dataset once its row is gone."""
+    delete_reports(instance)
+
+
+@receiver(post_save, sender=Dataset)
+@receiver(post_delete, sender=Dataset)
+def invalidate_dataset_cache(sender, instance, **kwargs):
+    """Drop cached responses for the dataset and its owner's history once the change commits."""
+    dataset_id, user_id = instance.pk, instance.user_id
+    
+    def invalidate():
+        bump_version('dataset', dataset_id)
+        bump_version('history', user_id)
+    
+    transaction.on_commit(invalidate)
@@ -0,0 +1,310 @@
+"""
+Columnar storage backend for dataset records.
+
+Each dataset stored with the columnar backend gets a directory of
+memory-mappable column files next to its Dataset row:
+
+- flowrate.npy, pressure.npy, temperature.npy: float64 arrays
+- equipment_type.npy: int32 codes into the categories listed in manifest.json
+- equipment_name.bin + equipment_name_offsets.npy: UTF-8 strings packed
+  end to end, with int64 byte offsets (one more offset than rows)
+- manifest.json: row count and type categories
+
+Whole-dataset reads (columnar responses, exports, PDF tables) use these
+files when they exist. EquipmentRecord rows are only needed for row-level
+queries such as the paginated /api/data/<id>/ endpoint.
+"""
+
+import json
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+
+ROWS = 'rows'
+COLUMNS = 'columns'
+BOTH = 'both'
+
+STORAGE_CHOICES = [
+    (ROWS, 'Record rows'),
+    (COLUMNS, 'Column files'),
+    (BOTH, 'Record rows and column files'),
+]
+
+# Record fields kept in the column store, in output order
+COLUMN_FIELDS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+NUMERIC_FIELDS = ['flowrate', 'pressure', 'temperature']
+
+
+def default_storage():
+    """
+    Return the storage mode for new datasets based on settings.
+    
+    EQUIPMENT_STORAGE_BACKEND selects 'rows' (default) or 'columnar';
+    with 'columnar', EQUIPMENT_KEEP_RECORD_ROWS decides whether the
+    EquipmentRecord rows are written as well.
+    """
+    if getattr(settings, 'EQUIPMENT_STORAGE_BACKEND', 'rows') != 'columnar':
+        return ROWS
+    if getattr(settings, 'EQUIPMENT_KEEP_RECORD_ROWS', True):
+        return BOTH
+    return COLUMNS
+
+
+def has_columns(dataset):
+    return dataset.storage in (COLUMNS, BOTH)
+
+
+def has_rows(dataset):
+    return dataset.storage in (ROWS, BOTH)
+
+
+def column_dir(dataset):
+    """Return the directory holding a dataset's column files."""
+    root = getattr(settings, 'EQUIPMENT_COLUMN_STORE_ROOT', Path(settings.MEDIA_ROOT) / 'columns')
+    return Path(root) / str(dataset.pk)
+
+
+class ColumnWriter:
+    """
+    Append cleaned record frames to a dataset's column files.
+    
+    Numeric columns and type codes are streamed to raw files as chunks
+    arrive and turned into .npy files by close(), so writing never holds
+    more than one chunk in memory.
+    """
+    
+    def __init__(self, dataset):
+        self.path = column_dir(dataset)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.rows = 0
+        self.categories = {}
+        self.name_bytes = 0
+        self.files = {
+            field: open(self.path / f'{field}.raw', 'wb')
+            for field in NUMERIC_FIELDS + ['equipment_type', 'equipment_name_offsets']
+        }
+        self.files['equipment_name'] = open(self.path / 'equipment_name.bin', 'wb')
+        np.zeros(1, dtype='<i8').tofile(self.files['equipment_name_offsets'])
+    
+    def append(self, records):
+        """
+        Add rows to the column files.
+        
+        Args:
+            records: DataFrame returned by utils.clean_records
+        """
+        for field in NUMERIC_FIELDS:
+            records[field].to_numpy(dtype='<f8').tofile(self.files[field])
+        
+        codes = np.array(
+            [self.categories.setdefault(value, len(self.categories)) for value in records['equipment_type']],
+            dtype='<i4'
+        )
+        codes.tofile(self.files['equipment_type'])
+        
+        encoded = [name.encode('utf-8') for name in records['equipment_name']]
+        self.files['equipment_name'].write(b''.join(encoded))
+        lengths = np.fromiter((len(name) for name in encoded), dtype='<i8', count=len(encoded))
+        offsets = self.name_bytes + np.cumsum(lengths)
+        offsets.tofile(self.files['equipment_name_offsets'])
+        if len(offsets):
+            self.name_bytes = int(offsets[-1])
+        
+        self.rows += len(records)
+    
+    def close(self):
+        """Finish the .npy files and write the manifest."""
+        for handle in self.files.values():
+            handle.close()
+        
+        for field, dtype, length in [(f, '<f8', self.rows) for f in NUMERIC_FIELDS] + [
+            ('equipment_type', '<i4', self.rows),
+            ('equipment_name_offsets', '<i8', self.rows + 1),
+        ]:
+            raw = self.path / f'{field}.raw'
+            with open(self.path / f'{field}.npy', 'wb') as out, open(raw, 'rb') as src:
+                np.lib.format.write_array_header_1_0(out, {
+                    'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                    'fortran_order': False,
+                    'shape': (length,),
+                })
+                shutil.copyfileobj(src, out)
+            raw.unlink()
+        
+        manifest = {'rows': self.rows, 'categories': list(self.categories)}
+        (self.path / 'manifest.json').write_text(json.dumps(manifest))
+    
+    def abort(self):
+        for handle in self.files.values():
+            handle.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+@contextmanager
+def open_column_writer(dataset):
+    """
+    Context manager yielding a ColumnWriter, or None for row-only datasets.
+    
+    The column files are finished on success and removed on error.
+    """
+    if not has_columns(dataset):
+        yield None
+        return
+    
+    writer = ColumnWriter(dataset)
+    try:
+        yield writer
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+
+class LazyColumn:
+    """
+    Read-only column whose values are decoded only for the rows asked for.
+    
+    Supports len(), indexing with an int, a slice, an index array or a
+    boolean mask (returning a NumPy object array), and np.asarray() /
+    tolist() for the whole column.
+    """
+    
+    def __len__(self):
+        raise NotImplementedError
+    
+    def take(self, rows):
+        """Return the values of the given row positions as an object array."""
+        raise NotImplementedError
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            rows = np.arange(*key.indices(len(self)))
+        else:
+            rows = np.arange(len(self))[key]
+            if np.ndim(rows) == 0:
+                return self.take(np.array([rows]))[0]
+        return self.take(rows)
+    
+    def __array__(self, dtype=None, copy=None):
+        values = self[:]
+        return values if dtype is None else values.astype(dtype)
+    
+    def tolist(self):
+        return self[:].tolist()
+
+
+class NameColumn(LazyColumn):
+    """equipment_name values decoded from the packed UTF-8 file on access."""
+    
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def take(self, rows):
+        starts = self.offsets[rows].tolist()
+        ends = self.offsets[rows + 1].tolist()
+        return np.array(
+            [bytes(self.blob[start:end]).decode('utf-8') for start, end in zip(starts, ends)],
+            dtype=object
+        )
+
+
+class CategoryColumn(LazyColumn):
+    """equipment_type values looked up from their int32 codes on access."""
+    
+    def __init__(self, categories, codes):
+        self.categories = categories
+        self.codes = codes
+    
+    def __len__(self):
+        return len(self.codes)
+    
+    def take(self, rows):
+        codes = np.asarray(self.codes[rows])
+        return self.categories[codes] if len(codes) else np.array([], dtype=object)
+
+
+def column_rows(dataset):
+    """Return the number of rows in a dataset's column files."""
+    return json.loads((column_dir(dataset) / 'manifest.json').read_text())['rows']
+
+
+def read_columns(dataset, mmap=True, start=0, stop=None):
+    """
+    Read a dataset's column files, or a window of rows from them.
+    
+    Numeric columns are NumPy arrays (memory-mapped by default). Names and
+    types are LazyColumns that decode only the rows that are indexed, so
+    reading a window or iterating in batches (iter_column_rows) never
+    holds every equipment name as a Python string.
+    
+    Args:
+        dataset: Dataset stored with column files
+        mmap: Memory-map the files instead of reading them
+        start: First row of the window
+        stop: Row to stop before (defaults to the end)
+        
+    Returns:
+        Dict mapping each COLUMN_FIELDS name to an array-like column;
+        pass it through as_arrays() where real NumPy arrays are needed
+    """
+    path = column_dir(dataset)
+    manifest = json.loads((path / 'manifest.json').read_text())
+    mmap_mode = 'r' if mmap else None
+    window = slice(start, manifest['rows'] if stop is None else min(stop, manifest['rows']))
+    
+    columns = {}
+    
+    offsets = np.load(path / 'equipment_name_offsets.npy', mmap_mode=mmap_mode)
+    blob_path = path / 'equipment_name.bin'
+    if mmap and blob_path.stat().st_size:
+        blob = np.memmap(blob_path, dtype=np.uint8, mode='r')
+    else:
+        blob = blob_path.read_bytes()
+    columns['equipment_name'] = NameColumn(blob, offsets[window.start:window.stop + 1])
+    
+    categories = np.array(manifest['categories'], dtype=object)
+    codes = np.load(path / 'equipment_type.npy', mmap_mode=mmap_mode)
+    columns['equipment_type'] = CategoryColumn(categories, codes[window])
+    
+    for field in NUMERIC_FIELDS:
+        columns[field] = np.load(path / f'{field}.npy', mmap_mode=mmap_mode)[window]
+    
+    return columns
+
+
+def as_arrays(columns):
+    """Decode every column of a read_columns() dict into a NumPy array."""
+    return {field: np.asarray(values) for field, values in columns.items()}
+
+
+def iter_column_rows(columns, start=0, stop=None, batch_size=10000):
+    """
+    Iterate over column arrays as (name, type, flowrate, pressure, temperature) tuples.
+    
+    Columns are sliced batch by batch, so LazyColumns from read_columns
+    are only decoded batch_size rows at a time.
+    
+    Args:
+        columns: Dict returned by read_columns (or of plain arrays)
+        start: First row to return
+        stop: Row to stop before (defaults to the end)
+        batch_size: Rows converted to Python objects at a time
+    """
+    total = len(columns['flowrate'])
+    stop = total if stop is None else min(stop, total)
+    for offset in range(start, stop, batch_size):
+        end = min(offset + batch_size, stop)
+        yield from zip(*(columns[field][offset:end].tolist() for field in COLUMN_FIELDS))
+
+
+def delete_columns(dataset):
+    """Remove a dataset's column files, if any."""
+    shutil.rmtree(column_dir(dataset), ignore_errors=True)
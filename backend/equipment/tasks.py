@@ -0,0 +1,111 @@
+"""
+Background task helpers for work that should not hold up a request.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+_ingest_executor = None
+_ingest_executor_lock = threading.Lock()
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide thread pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'EQUIPMENT_BACKGROUND_WORKERS', 2),
+                thread_name_prefix='equipment-task'
+            )
+        return _executor
+
+
+def get_ingest_executor():
+    """
+    Return the process-wide thread pool for asynchronous uploads.
+    
+    Ingestion gets its own pool so a few large uploads cannot hold up
+    report jobs and retention cleanup on the shared pool, or the reverse.
+    """
+    global _ingest_executor
+    with _ingest_executor_lock:
+        if _ingest_executor is None:
+            _ingest_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'EQUIPMENT_INGEST_WORKERS', 2),
+                thread_name_prefix='equipment-ingest'
+            )
+        return _ingest_executor
+
+
+def submit(executor, func, *args, **kwargs):
+    """
+    Run a function on the given thread pool.
+    
+    Exceptions are logged rather than raised, and the worker's database
+    connection is closed when the function returns.
+    
+    Returns:
+        concurrent.futures.Future for the call
+    """
+    def task():
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            logger.exception("Background task %s failed", getattr(func, '__qualname__', func))
+            raise
+        finally:
+            connection.close()
+    
+    return executor.submit(task)
+
+
+def run_in_background(func, *args, **kwargs):
+    """Run a function on the background thread pool (see submit)."""
+    return submit(get_executor(), func, *args, **kwargs)
+
+
+def run_ingest(func, *args, **kwargs):
+    """Run a function on the ingest thread pool (see submit)."""
+    return submit(get_ingest_executor(), func, *args, **kwargs)
+
+
+def init_worker_process():
+    """Set up Django in a freshly spawned pool process."""
+    import django
+    django.setup()
+
+
+def get_process_pool():
+    """
+    Return the process-wide process pool for CPU-bound work, creating it on first use.
+    
+    Workers are spawned rather than forked so they never share the parent's
+    database connections, and set up Django themselves; functions run on
+    the pool take plain arguments (such as ids) and query what they need.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool._broken:
+            # A worker that died (e.g. killed for memory) breaks the whole pool
+            _process_pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'EQUIPMENT_REPORT_PROCESSES', 2),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker_process
+            )
+        return _process_pool
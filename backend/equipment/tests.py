@@ -0,0 +1,113 @@
+import pandas as pd
+from django.test import TestCase
+from django.urls import reverse
+
+from .cache import get_cache
+from .models import Dataset, EquipmentRecord
+from .utils import MAX_REPORTED_ERRORS, CSVValidationError, SummaryAccumulator, calculate_summary, check_csv
+
+
+class HistoryQueryCountTests(TestCase):
+    """GET /api/history/ must not issue one query per listed dataset."""
+    
+    # The history ETag lookup and the annotated dataset list
+    EXPECTED_QUERIES = 2
+    
+    def setUp(self):
+        get_cache().clear()
+    
+    def create_datasets(self, count, records_per_dataset=3):
+        for i in range(count):
+            dataset = Dataset.objects.create(filename=f'equipment_{i}.csv', total_count=records_per_dataset)
+            EquipmentRecord.objects.bulk_create([
+                EquipmentRecord(
+                    dataset=dataset,
+                    equipment_name=f'Pump-{i}-{j}',
+                    equipment_type='Pump',
+                    flowrate=100.0 + j,
+                    pressure=5.0,
+                    temperature=80.0
+                )
+                for j in range(records_per_dataset)
+            ])
+    
+    def get_history(self):
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get(reverse('history'))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+    
+    def test_query_count_is_constant(self):
+        self.create_datasets(1)
+        self.assertEqual(len(self.get_history()), 1)
+        
+        get_cache().clear()
+        self.create_datasets(4)
+        self.assertEqual(len(self.get_history()), 5)
+    
+    def test_records_count_is_annotated(self):
+        self.create_datasets(3, records_per_dataset=4)
+        self.assertEqual([d['records_count'] for d in self.get_history()], [4, 4, 4])
+
+
+class SummaryAccumulatorTests(TestCase):
+    """Chunked summaries must store exactly what the whole-file summary stores."""
+    
+    def test_chunked_type_order_matches_whole_file(self):
+        # B and C tie, and the first chunk sees C most often
+        df = pd.DataFrame({
+            'Type': ['A', 'B', 'C', 'C', 'B', 'A', 'A'],
+            'Flowrate': 1.0,
+            'Pressure': 2.0,
+            'Temperature': 3.0,
+        })
+        whole = calculate_summary(df)
+        
+        chunked = SummaryAccumulator()
+        for start in range(0, len(df), 4):
+            chunked.update(df.iloc[start:start + 4])
+        
+        merged = SummaryAccumulator().update(df.iloc[:4]).merge(SummaryAccumulator().update(df.iloc[4:]))
+        
+        self.assertEqual(list(whole['type_distribution'].items()), [('A', 3), ('B', 2), ('C', 2)])
+        self.assertEqual(list(chunked.to_summary()['type_distribution'].items()), list(whole['type_distribution'].items()))
+        self.assertEqual(merged.to_summary(), whole)
+
+
+class RetentionTests(TestCase):
+    """Retention must leave datasets that are still being ingested alone."""
+    
+    def test_processing_datasets_are_not_counted_or_deleted(self):
+        processing = Dataset.objects.create(filename='big.csv', status=Dataset.PROCESSING, progress=10)
+        ready = [Dataset.objects.create(filename=f'equipment_{i}.csv') for i in range(3)]
+        
+        Dataset.cleanup_old_datasets(keep=2)
+        
+        remaining = set(Dataset.objects.values_list('pk', flat=True))
+        self.assertEqual(remaining, {processing.pk, ready[1].pk, ready[2].pk})
+
+
+class CheckCSVTests(TestCase):
+    """Validation reports the first bad cells and counts all of them."""
+    
+    def test_error_report_is_capped_and_counted(self):
+        rows = MAX_REPORTED_ERRORS * 3
+        df = pd.DataFrame({
+            'Equipment Name': [f'Pump-{i}' for i in range(rows)],
+            'Type': 'Pump',
+            'Flowrate': 'n/a',
+            'Pressure': ['x' if i % 2 else '1.5' for i in range(rows)],
+            'Temperature': 80.0,
+        })
+        
+        with self.assertRaises(CSVValidationError) as raised:
+            check_csv(df)
+        
+        errors = raised.exception.errors
+        self.assertEqual(len(errors), MAX_REPORTED_ERRORS)
+        self.assertEqual(raised.exception.error_count, rows + rows // 2)
+        self.assertEqual(errors[:3], [
+            {'row': 1, 'column': 'Flowrate', 'value': 'n/a'},
+            {'row': 2, 'column': 'Flowrate', 'value': 'n/a'},
+            {'row': 2, 'column': 'Pressure', 'value': 'x'},
+        ])
@@ -8,11 +8,19 @@ from . import views
 urlpatterns = [
     # Data endpoints
     path('upload/', views.CSVUploadView.as_view(), name='csv-upload'),
+    path('upload/<int:pk>/progress/', views.UploadProgressView.as_view(), name='upload-progress'),
     path('summary/<int:pk>/', views.DatasetSummaryView.as_view(), name='dataset-summary'),
     path('data/<int:pk>/', views.DatasetDataView.as_view(), name='dataset-data'),
+    path('export/<int:pk>/<str:fmt>/', views.DatasetExportView.as_view(), name='dataset-export'),
+    path('columns/<int:pk>/', views.DatasetColumnsView.as_view(), name='dataset-columns'),
     path('history/', views.HistoryView.as_view(), name='history'),
     path('dataset/<int:pk>/', views.DatasetDeleteView.as_view(), name='dataset-delete'),
     path('report/<int:pk>/', views.PDFReportView.as_view(), name='pdf-report'),
+    path('report/batch/', views.BatchReportView.as_view(), name='pdf-report-batch'),
+    path('jobs/', views.JobCreateView.as_view(), name='job-create'),
+    path('jobs/<int:pk>/', views.JobStatusView.as_view(), name='job-status'),
+    path('jobs/<int:pk>/result/', views.JobResultView.as_view(), name='job-result'),
+    path('cache/stats/', views.CacheStatsView.as_view(), name='cache-stats'),
     
     # Authentication endpoints
     path('auth/register/', views.RegisterView.as_view(), name='register'),
@@ -2,8 +2,65 @@
 Utility functions for CSV parsing and data analysis.
 """
 
+import logging
+import time
+
 import pandas as pd
 from io import StringIO
+from django.conf import settings
+from django.db import transaction
+
+from .storage import has_rows
+
+
+logger = logging.getLogger(__name__)
+
+# Maps CSV column names to EquipmentRecord field names
+RECORD_FIELDS = {
+    'Equipment Name': 'equipment_name',
+    'Type': 'equipment_type',
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+# Text columns are declared up front; numeric columns are converted by the
+# C parser while reading and only re-parsed when they contain dirty cells
+TEXT_DTYPES = {'Equipment Name': str, 'Type': str}
+
+# Maximum number of bad cells listed in a validation error report
+MAX_REPORTED_ERRORS = 100
+
+DEFAULT_INGEST_BATCH_SIZE = 5000
+DEFAULT_CSV_CHUNK_SIZE = 50000
+
+
+class CSVValidationError(ValueError):
+    """
+    Raised when a CSV fails validation.
+    
+    The errors attribute holds a list of {'row', 'column', 'value'} dicts
+    for the offending cells (rows are 1-based data row numbers), at most
+    MAX_REPORTED_ERRORS of them; error_count is the total number of bad
+    cells.
+    """
+    
+    def __init__(self, message, errors=None, error_count=None):
+        super().__init__(message)
+        self.errors = errors or []
+        self.error_count = len(self.errors) if error_count is None else error_count
+
+
+def is_required_column(name):
+    """Return True if a raw CSV header names one of the required columns."""
+    return str(name).strip() in RECORD_FIELDS
+
+
+def read_csv_typed(source, **kwargs):
+    """Read only the required columns of a CSV, declaring the text dtypes."""
+    return pd.read_csv(source, usecols=is_required_column, dtype=TEXT_DTYPES, **kwargs)
 
 
 def parse_csv(file_content):
@@ -24,55 +81,199 @@ def parse_csv(file_content):
             file_content = file_content.decode('utf-8')
         
         if isinstance(file_content, str):
-            df = pd.read_csv(StringIO(file_content))
+            df = read_csv_typed(StringIO(file_content))
         else:
-            df = pd.read_csv(file_content)
+            df = read_csv_typed(file_content)
         
         return df
     except Exception as e:
         raise ValueError(f"Failed to parse CSV: {str(e)}")
 
 
-def validate_csv(df):
+def parse_csv_chunks(file, chunksize=None):
+    """
+    Parse a CSV file incrementally, yielding one DataFrame per chunk.
+    
+    The file is read straight from its file-like object, so only one chunk
+    of rows is held in memory at a time.
+    
+    Args:
+        file: Binary file-like object (e.g. an uploaded file)
+        chunksize: Rows per chunk (defaults to EQUIPMENT_CSV_CHUNK_SIZE)
+        
+    Yields:
+        pandas DataFrames of at most chunksize rows
+        
+    Raises:
+        ValueError: If the CSV cannot be parsed
+    """
+    if chunksize is None:
+        chunksize = getattr(settings, 'EQUIPMENT_CSV_CHUNK_SIZE', DEFAULT_CSV_CHUNK_SIZE)
+    
+    try:
+        reader = read_csv_typed(file, chunksize=chunksize, encoding='utf-8')
+        with reader:
+            for chunk in reader:
+                yield chunk
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Failed to parse CSV: {str(e)}")
+
+
+def coerce_numeric_columns(df):
     """
-    Validate that the DataFrame has all required columns.
+    Cast the numeric columns of a DataFrame to float64 in place.
     
-    Required columns:
-    - Equipment Name
-    - Type
-    - Flowrate
-    - Pressure
-    - Temperature
+    Columns the parser already read as numbers are cast without re-parsing.
+    Columns containing non-numeric cells are converted once with
+    errors='coerce'; only the first MAX_REPORTED_ERRORS offending cells of
+    each column are turned into error dicts.
     
     Args:
-        df: pandas DataFrame
+        df: pandas DataFrame with normalized column names
         
     Returns:
-        Tuple of (is_valid, error_message)
+        (errors, error_count): the first MAX_REPORTED_ERRORS
+        {'row', 'column', 'value'} dicts by row, and the total number of
+        non-numeric cells
     """
-    required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+    errors = []
+    error_count = 0
+    for col in NUMERIC_COLUMNS:
+        column = df[col]
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            df[col] = column.astype('float64')
+            continue
+        
+        converted = pd.to_numeric(column, errors='coerce').astype('float64')
+        bad = converted.isna() & column.notna()
+        error_count += int(bad.sum())
+        for index, value in column[bad].head(MAX_REPORTED_ERRORS).items():
+            errors.append({'row': int(index) + 1, 'column': col, 'value': str(value)})
+        df[col] = converted
     
+    errors.sort(key=lambda error: error['row'])
+    return errors[:MAX_REPORTED_ERRORS], error_count
+
+
+def check_csv(df):
+    """
+    Validate a parsed DataFrame and convert its numeric columns to float64.
+    
+    Args:
+        df: pandas DataFrame from parse_csv or parse_csv_chunks
+        
+    Returns:
+        The same DataFrame with normalized column names and typed numeric columns
+        
+    Raises:
+        CSVValidationError: If columns are missing, the file is empty or
+            numeric columns contain non-numeric values
+    """
     # Normalize column names (strip whitespace)
     df.columns = df.columns.str.strip()
     
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    missing_columns = [col for col in RECORD_FIELDS if col not in df.columns]
     
     if missing_columns:
-        return False, f"Missing required columns: {', '.join(missing_columns)}"
+        raise CSVValidationError(f"Missing required columns: {', '.join(missing_columns)}")
     
     # Check for empty dataframe
     if df.empty:
-        return False, "CSV file is empty"
+        raise CSVValidationError("CSV file is empty")
     
     # Validate numeric columns
-    numeric_columns = ['Flowrate', 'Pressure', 'Temperature']
-    for col in numeric_columns:
-        try:
-            pd.to_numeric(df[col], errors='raise')
-        except (ValueError, TypeError):
-            return False, f"Column '{col}' must contain numeric values"
+    errors, error_count = coerce_numeric_columns(df)
+    if errors:
+        raise CSVValidationError(
+            f"Column '{errors[0]['column']}' must contain numeric values",
+            errors,
+            error_count
+        )
+    
+    return df
+
+
+class SummaryAccumulator:
+    """
+    Mergeable running totals for the dataset summary statistics.
+    
+    Each call to update() scans a DataFrame once and folds its row count,
+    per-column sums and type counts into the totals, so chunks (or rows
+    appended later) can be absorbed without rescanning earlier data.
+    """
+    
+    def __init__(self):
+        self.total_count = 0
+        self.sums = dict.fromkeys(NUMERIC_COLUMNS, 0.0)
+        self.type_counts = {}
+    
+    def update(self, df):
+        """
+        Add the rows of a DataFrame to the totals.
+        
+        Args:
+            df: pandas DataFrame with equipment data
+            
+        Returns:
+            The accumulator, for chaining
+        """
+        df = df.dropna()
+        
+        self.total_count += len(df)
+        for col in NUMERIC_COLUMNS:
+            self.sums[col] += float(pd.to_numeric(df[col]).sum())
+        # Unsorted counts are in order of first appearance; new types are
+        # appended to the dict, so it keeps file order across chunks
+        for eq_type, count in df['Type'].value_counts(sort=False).items():
+            self.type_counts[eq_type] = self.type_counts.get(eq_type, 0) + int(count)
+        
+        return self
+    
+    def merge(self, other):
+        """
+        Fold the totals of another accumulator into this one.
+        
+        Merge accumulators in file order (other covering later rows) so
+        that count ties keep the order in which types first appeared.
+        
+        Args:
+            other: SummaryAccumulator instance
+            
+        Returns:
+            The accumulator, for chaining
+        """
+        self.total_count += other.total_count
+        for col in NUMERIC_COLUMNS:
+            self.sums[col] += other.sums[col]
+        for eq_type, count in other.type_counts.items():
+            self.type_counts[eq_type] = self.type_counts.get(eq_type, 0) + count
+        
+        return self
     
-    return True, None
+    def mean(self, col):
+        """Return the rounded mean of a numeric column, or 0.0 when empty."""
+        if self.total_count == 0:
+            return 0.0
+        return round(self.sums[col] / self.total_count, 2)
+    
+    def to_summary(self):
+        """
+        Return the summary in the format stored on Dataset.
+        
+        Returns:
+            Dictionary in the same format as calculate_summary
+        """
+        # Most common types first; the stable sort keeps ties in the order
+        # they first appeared, matching pandas' value_counts() on the whole file
+        type_distribution = dict(sorted(self.type_counts.items(), key=lambda item: -item[1]))
+        
+        return {
+            'total_count': self.total_count,
+            'avg_flowrate': self.mean('Flowrate'),
+            'avg_pressure': self.mean('Pressure'),
+            'avg_temperature': self.mean('Temperature'),
+            'type_distribution': type_distribution
+        }
 
 
 def calculate_summary(df):
@@ -90,52 +291,133 @@ def calculate_summary(df):
         - avg_temperature: Average temperature
         - type_distribution: Dict of equipment type counts
     """
-    # Clean the dataframe
+    return SummaryAccumulator().update(df).to_summary()
+
+
+def ingest_csv_stream(file, dataset, chunksize=None, column_writer=None, on_chunk=None):
+    """
+    Validate, summarize and insert a CSV file chunk by chunk.
+    
+    Callers should run this inside a transaction so that a validation error
+    in a later chunk discards the records inserted for earlier ones.
+    
+    Args:
+        file: Binary file-like object containing the CSV
+        dataset: Dataset model instance the records belong to
+        chunksize: Rows per chunk (defaults to EQUIPMENT_CSV_CHUNK_SIZE)
+        column_writer: Optional storage.ColumnWriter for the dataset
+        on_chunk: Optional callable invoked with the number of rows
+            ingested so far after each chunk
+            
+    Returns:
+        Summary dictionary in the same format as calculate_summary
+        
+    Raises:
+        ValueError: If the CSV cannot be parsed
+        CSVValidationError: If a chunk fails validation
+    """
+    accumulator = SummaryAccumulator()
+    
+    for chunk in parse_csv_chunks(file, chunksize):
+        check_csv(chunk)
+        accumulator.update(chunk)
+        ingest_records(chunk, dataset, column_writer=column_writer)
+        if on_chunk is not None:
+            on_chunk(accumulator.total_count)
+    
+    return accumulator.to_summary()
+
+
+def clean_records(df):
+    """
+    Convert the equipment DataFrame into record columns using whole-column operations.
+    
+    Rows containing missing values are dropped, text columns are stripped
+    and numeric columns are cast to float64.
+    
+    Args:
+        df: pandas DataFrame with equipment data
+        
+    Returns:
+        pandas DataFrame whose columns are the EquipmentRecord field names
+    """
     df = df.dropna()
     
-    # Calculate averages
-    total_count = len(df)
-    avg_flowrate = round(float(df['Flowrate'].mean()), 2) if total_count > 0 else 0.0
-    avg_pressure = round(float(df['Pressure'].mean()), 2) if total_count > 0 else 0.0
-    avg_temperature = round(float(df['Temperature'].mean()), 2) if total_count > 0 else 0.0
-    
-    # Calculate type distribution
-    type_distribution = df['Type'].value_counts().to_dict()
-    
-    return {
-        'total_count': total_count,
-        'avg_flowrate': avg_flowrate,
-        'avg_pressure': avg_pressure,
-        'avg_temperature': avg_temperature,
-        'type_distribution': type_distribution
-    }
+    columns = {}
+    for column, field in RECORD_FIELDS.items():
+        if column in NUMERIC_COLUMNS:
+            columns[field] = pd.to_numeric(df[column]).astype('float64')
+        else:
+            columns[field] = df[column].astype(str).str.strip()
+    
+    return pd.DataFrame(columns)
+
+
+def iter_record_batches(records, dataset, batch_size):
+    """
+    Yield lists of unsaved EquipmentRecord instances built from cleaned columns.
+    
+    Args:
+        records: DataFrame returned by clean_records
+        dataset: Dataset model instance
+        batch_size: Maximum number of records per batch
+        
+    Yields:
+        Lists of at most batch_size EquipmentRecord instances
+    """
+    from .models import EquipmentRecord
+    
+    fields = list(RECORD_FIELDS.values())
+    for start in range(0, len(records), batch_size):
+        chunk = records.iloc[start:start + batch_size]
+        yield [
+            EquipmentRecord(dataset=dataset, **dict(zip(fields, values)))
+            for values in chunk.itertuples(index=False, name=None)
+        ]
 
 
-def prepare_records(df, dataset):
+def ingest_records(df, dataset, batch_size=None, column_writer=None):
     """
-    Prepare equipment records from DataFrame for database insertion.
+    Store the equipment records of a DataFrame.
+    
+    Rows are inserted in batches unless the dataset uses column storage
+    only; when a column writer is given the records are appended to the
+    dataset's column files as well.
     
     Args:
         df: pandas DataFrame with equipment data
         dataset: Dataset model instance
+        batch_size: Records per INSERT batch (defaults to EQUIPMENT_INGEST_BATCH_SIZE)
+        column_writer: Optional storage.ColumnWriter for the dataset
         
     Returns:
-        List of EquipmentRecord instances (not saved)
+        Dictionary containing:
+        - rows: Number of records inserted
+        - seconds: Wall time spent cleaning and inserting
+        - rows_per_sec: Insert throughput
     """
     from .models import EquipmentRecord
     
-    records = []
-    df = df.dropna()
+    if batch_size is None:
+        batch_size = getattr(settings, 'EQUIPMENT_INGEST_BATCH_SIZE', DEFAULT_INGEST_BATCH_SIZE)
     
-    for _, row in df.iterrows():
-        record = EquipmentRecord(
-            dataset=dataset,
-            equipment_name=str(row['Equipment Name']).strip(),
-            equipment_type=str(row['Type']).strip(),
-            flowrate=float(row['Flowrate']),
-            pressure=float(row['Pressure']),
-            temperature=float(row['Temperature'])
-        )
-        records.append(record)
+    started = time.perf_counter()
+    records = clean_records(df)
     
-    return records
+    if column_writer is not None:
+        column_writer.append(records)
+    
+    if has_rows(dataset):
+        with transaction.atomic():
+            for batch in iter_record_batches(records, dataset, batch_size):
+                EquipmentRecord.objects.bulk_create(batch)
+    
+    seconds = time.perf_counter() - started
+    rows = len(records)
+    stats = {
+        'rows': rows,
+        'seconds': round(seconds, 4),
+        'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else float(rows),
+    }
+    logger.info("Ingested %(rows)d records in %(seconds).3fs (%(rows_per_sec).0f rows/sec)", stats)
+    return stats
@@ -8,14 +8,47 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authtoken.models import Token
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.http import FileResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 
-from .models import Dataset, EquipmentRecord
-from .serializers import DatasetSerializer, DatasetDetailSerializer, UserSerializer
-from .utils import parse_csv, validate_csv, calculate_summary, prepare_records
-from .pdf_generator import generate_equipment_report
+from .models import Dataset, Job
+from .serializers import DatasetSerializer, EquipmentRecordSerializer, JobSerializer, UserSerializer
+from .filters import RecordFilter, RecordOrderingFilter
+from .pagination import RecordCursorPagination
+from .utils import (
+    CSVValidationError, parse_csv, check_csv, calculate_summary,
+    ingest_records, ingest_csv_stream
+)
+from .pdf_generator import DEFAULT_LAYOUT, get_layout
+from .reports import get_report, prerender_report
+from .batch import iter_report_zip
+from .tasks import run_in_background
+from .jobs import enqueue_job
+from .ingest import iter_progress_events, spool_upload
+from .export import iter_record_rows, iter_ndjson, iter_csv, load_record_columns, EXPORT_FIELDS
+from .storage import (
+    COLUMN_FIELDS, default_storage, has_columns, has_rows,
+    open_column_writer, read_columns, iter_column_rows, as_arrays
+)
+from .renderers import ArrowStreamRenderer, ParquetRenderer
+from .cache import cache_response, cache_stats
+from .conditional import conditional, dataset_etag, dataset_last_modified, history_etag, report_etag
+
+
+def not_ready_response(dataset):
+    """Return a 409 response for a dataset whose records are not available yet, else None."""
+    if dataset.is_ready:
+        return None
+    return Response(
+        {'error': f'Dataset is {dataset.status}', 'details': dataset.error},
+        status=status.HTTP_409_CONFLICT
+    )
 
 
 class CSVUploadView(APIView):
@@ -27,11 +60,70 @@ class CSVUploadView(APIView):
     - Validates columns
     - Calculates summary statistics
     - Stores dataset and records
-    - Returns summary data
+    - Returns summary data and a records_url link to the paginated records
+    
+    Files of at least EQUIPMENT_STREAMING_UPLOAD_THRESHOLD bytes (or any file
+    when ?stream=true is passed) are parsed, validated, summarized and
+    inserted chunk by chunk so memory use does not grow with file size.
+    
+    With ?async=true (or EQUIPMENT_ASYNC_UPLOADS) the file is only spooled
+    to disk and 202 is returned with the dataset in the 'processing' state;
+    ingestion runs in the background and its progress can be polled at
+    /api/summary/<id>/ or streamed from /api/upload/<id>/progress/.
     """
     parser_classes = [MultiPartParser, FormParser]
     permission_classes = [AllowAny]
     
+    def should_run_async(self, request):
+        value = request.query_params.get('async')
+        if value is not None:
+            return value.lower() in ('1', 'true', 'yes')
+        return getattr(settings, 'EQUIPMENT_ASYNC_UPLOADS', False)
+    
+    def should_stream(self, request, file):
+        if request.query_params.get('stream', '').lower() in ('1', 'true', 'yes'):
+            return True
+        threshold = getattr(settings, 'EQUIPMENT_STREAMING_UPLOAD_THRESHOLD', None)
+        return threshold is not None and file.size >= threshold
+    
+    def create_dataset(self, file, user):
+        # Read and parse CSV
+        df = parse_csv(file)
+        
+        # Validate CSV structure and convert numeric columns
+        df = check_csv(df)
+        
+        # Calculate summary statistics
+        summary = calculate_summary(df)
+        
+        with transaction.atomic():
+            # Create dataset
+            dataset = Dataset.objects.create(
+                user=user,
+                filename=file.name,
+                total_count=summary['total_count'],
+                avg_flowrate=summary['avg_flowrate'],
+                avg_pressure=summary['avg_pressure'],
+                avg_temperature=summary['avg_temperature'],
+                type_distribution=summary['type_distribution'],
+                storage=default_storage()
+            )
+            
+            # Create equipment records
+            with open_column_writer(dataset) as writer:
+                ingest_records(df, dataset, column_writer=writer)
+        return dataset
+    
+    def create_dataset_streaming(self, file, user):
+        with transaction.atomic():
+            dataset = Dataset.objects.create(user=user, filename=file.name, storage=default_storage())
+            with open_column_writer(dataset) as writer:
+                summary = ingest_csv_stream(file, dataset, column_writer=writer)
+            for field, value in summary.items():
+                setattr(dataset, field, value)
+            dataset.save(update_fields=list(summary))
+        return dataset
+    
     def post(self, request):
         if 'file' not in request.FILES:
             return Response(
@@ -49,44 +141,38 @@ class CSVUploadView(APIView):
             )
         
         try:
-            # Read and parse CSV
-            file_content = file.read().decode('utf-8')
-            df = parse_csv(file_content)
-            
-            # Validate CSV structure
-            is_valid, error_msg = validate_csv(df)
-            if not is_valid:
-                return Response(
-                    {'error': error_msg},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            user = request.user if request.user.is_authenticated else None
             
-            # Calculate summary statistics
-            summary = calculate_summary(df)
+            if self.should_run_async(request):
+                dataset = spool_upload(file, user)
+                data = DatasetSerializer(dataset).data
+                data['status_url'] = request.build_absolute_uri(reverse('dataset-summary', args=[dataset.id]))
+                data['progress_url'] = request.build_absolute_uri(reverse('upload-progress', args=[dataset.id]))
+                data['records_url'] = request.build_absolute_uri(reverse('dataset-data', args=[dataset.id]))
+                return Response(data, status=status.HTTP_202_ACCEPTED)
             
-            # Create dataset
-            user = request.user if request.user.is_authenticated else None
-            dataset = Dataset.objects.create(
-                user=user,
-                filename=file.name,
-                total_count=summary['total_count'],
-                avg_flowrate=summary['avg_flowrate'],
-                avg_pressure=summary['avg_pressure'],
-                avg_temperature=summary['avg_temperature'],
-                type_distribution=summary['type_distribution']
-            )
+            if self.should_stream(request, file):
+                dataset = self.create_dataset_streaming(file, user)
+            else:
+                dataset = self.create_dataset(file, user)
             
-            # Create equipment records
-            records = prepare_records(df, dataset)
-            EquipmentRecord.objects.bulk_create(records)
+            # Cleanup old datasets according to the retention policy
+            Dataset.apply_retention(user=user)
             
-            # Cleanup old datasets (keep only last 5)
-            Dataset.cleanup_old_datasets(user=user, keep=5)
+            if getattr(settings, 'EQUIPMENT_PRERENDER_REPORTS', False):
+                dataset_id = dataset.pk
+                transaction.on_commit(lambda: run_in_background(prerender_report, dataset_id))
             
             # Return response
-            serializer = DatasetDetailSerializer(dataset)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            data = DatasetSerializer(dataset).data
+            data['records_url'] = request.build_absolute_uri(reverse('dataset-data', args=[dataset.id]))
+            return Response(data, status=status.HTTP_201_CREATED)
             
+        except CSVValidationError as e:
+            return Response(
+                {'error': str(e), 'details': e.errors, 'error_count': e.error_count},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except ValueError as e:
             return Response(
                 {'error': str(e)},
@@ -99,6 +185,31 @@ class CSVUploadView(APIView):
             )
 
 
+class UploadProgressView(APIView):
+    """
+    Stream the ingestion progress of an asynchronous upload as Server-Sent Events.
+    
+    GET /api/upload/<id>/progress/
+    
+    Sends a JSON event {"status", "progress", "error"} whenever the progress
+    changes, and closes the stream once the dataset is ready or failed.
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request, pk):
+        if not Dataset.objects.filter(pk=pk).exists():
+            return Response(
+                {'error': 'Dataset not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        interval = getattr(settings, 'EQUIPMENT_PROGRESS_POLL_INTERVAL', 0.5)
+        response = StreamingHttpResponse(iter_progress_events(pk, interval), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
 class DatasetSummaryView(APIView):
     """
     Get summary statistics for a specific dataset.
@@ -107,6 +218,8 @@ class DatasetSummaryView(APIView):
     """
     permission_classes = [AllowAny]
     
+    @conditional(dataset_etag, dataset_last_modified)
+    @cache_response('summary')
     def get(self, request, pk):
         try:
             dataset = Dataset.objects.get(pk=pk)
@@ -121,37 +234,182 @@ class DatasetSummaryView(APIView):
 
 class DatasetDataView(APIView):
     """
-    Get all equipment records for a specific dataset.
+    Get the equipment records for a specific dataset, one page at a time.
     
     GET /api/data/<id>/
+    - page_size: Records per page (default EQUIPMENT_RECORDS_PAGE_SIZE)
+    - cursor: Opaque cursor taken from the next/previous links
+    - ordering: Sort field, e.g. flowrate or -temperature (default id)
+    - type: Equipment type, or a comma-separated list of types
+    - min_<field> / max_<field>: Range filters on flowrate, pressure, temperature
+    
+    Datasets stored as column files only are paged from those files with
+    the same cursors; their record ids are 1-based row positions.
     """
     permission_classes = [AllowAny]
+    pagination_class = RecordCursorPagination
+    filter_backends = [RecordFilter, RecordOrderingFilter]
+    ordering_fields = ['id', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+    ordering = ['id']
     
+    @conditional(dataset_etag, dataset_last_modified)
+    @cache_response('data')
     def get(self, request, pk):
         try:
             dataset = Dataset.objects.get(pk=pk)
-            serializer = DatasetDetailSerializer(dataset)
-            return Response(serializer.data)
         except Dataset.DoesNotExist:
             return Response(
                 {'error': 'Dataset not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        
+        not_ready = not_ready_response(dataset)
+        if not_ready:
+            return not_ready
+        
+        paginator = self.pagination_class()
+        if has_rows(dataset):
+            records = dataset.records.all()
+            for backend in self.filter_backends:
+                records = backend().filter_queryset(request, records, self)
+            page = paginator.paginate_queryset(records, request, view=self)
+            page = EquipmentRecordSerializer(page, many=True).data
+        else:
+            columns = read_columns(dataset)
+            mask = RecordFilter().mask_columns(request, columns)
+            page = paginator.paginate_columns(columns, request, mask=mask, view=self)
+        
+        data = DatasetSerializer(dataset).data
+        data['records'] = page
+        data['next'] = paginator.get_next_link()
+        data['previous'] = paginator.get_previous_link()
+        return Response(data)
+
+
+class DatasetExportView(APIView):
+    """
+    Stream every equipment record of a dataset.
+    
+    GET /api/export/<id>/ndjson/ - one JSON object per line
+    GET /api/export/<id>/csv/    - CSV in the upload format
+    
+    Records are read from a database cursor as tuples (or from the column
+    files when the dataset has no record rows, in which case NDJSON objects
+    carry no id) and encoded as they are sent. The type and range filters
+    of /api/data/<id>/ also apply.
+    """
+    permission_classes = [AllowAny]
+    filter_backends = [RecordFilter]
+    
+    content_types = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+    
+    def get(self, request, pk, fmt):
+        if fmt not in self.content_types:
+            return Response(
+                {'error': f"Unsupported export format '{fmt}'. Use one of: {', '.join(self.content_types)}"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            dataset = Dataset.objects.get(pk=pk)
+        except Dataset.DoesNotExist:
+            return Response(
+                {'error': 'Dataset not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        not_ready = not_ready_response(dataset)
+        if not_ready:
+            return not_ready
+        
+        fields = EXPORT_FIELDS if fmt == 'ndjson' else COLUMN_FIELDS
+        if has_rows(dataset):
+            records = dataset.records.all()
+            for backend in self.filter_backends:
+                records = backend().filter_queryset(request, records, self)
+            rows = iter_record_rows(records, fields)
+        else:
+            columns = read_columns(dataset)
+            for backend in self.filter_backends:
+                columns = backend().filter_columns(request, columns)
+            fields = COLUMN_FIELDS
+            rows = iter_column_rows(columns)
+        
+        content = iter_ndjson(rows, fields) if fmt == 'ndjson' else iter_csv(rows)
+        response = StreamingHttpResponse(content, content_type=self.content_types[fmt])
+        response['Content-Disposition'] = f'attachment; filename="equipment_records_{dataset.id}.{fmt}"'
+        return response
+
+
+class DatasetColumnsView(APIView):
+    """
+    Get every equipment record of a dataset in a columnar format.
+    
+    GET /api/columns/<id>/
+    The format is chosen from the Accept header (or ?format=):
+    - application/vnd.apache.arrow.stream - Arrow IPC stream (default)
+    - application/vnd.apache.parquet      - Parquet file
+    - application/json                    - JSON object of column arrays
+    
+    Served from the dataset's column files when it has them.
+    """
+    permission_classes = [AllowAny]
+    renderer_classes = [ArrowStreamRenderer, ParquetRenderer, JSONRenderer]
+    filter_backends = [RecordFilter]
+    
+    def get(self, request, pk):
+        try:
+            dataset = Dataset.objects.get(pk=pk)
+        except Dataset.DoesNotExist:
+            return Response(
+                {'error': 'Dataset not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        not_ready = not_ready_response(dataset)
+        if not_ready:
+            return not_ready
+        
+        if has_columns(dataset):
+            columns = read_columns(dataset)
+            for backend in self.filter_backends:
+                columns = backend().filter_columns(request, columns)
+            columns = as_arrays(columns)
+        else:
+            records = dataset.records.all()
+            for backend in self.filter_backends:
+                records = backend().filter_queryset(request, records, self)
+            columns = load_record_columns(records)
+        
+        response = Response(columns)
+        if request.accepted_renderer.render_style == 'binary':
+            extension = request.accepted_renderer.format
+            response['Content-Disposition'] = f'attachment; filename="equipment_records_{dataset.id}.{extension}"'
+        return response
 
 
 class HistoryView(APIView):
     """
-    Get the last 5 uploaded datasets.
+    Get the most recently uploaded datasets kept by the retention policy.
     
     GET /api/history/
     """
     permission_classes = [AllowAny]
     
+    @conditional(history_etag)
+    @cache_response('history', scope='history')
     def get(self, request):
         if request.user.is_authenticated:
-            datasets = Dataset.objects.filter(user=request.user)[:5]
+            user = request.user
+            datasets = Dataset.objects.filter(user=user)
         else:
-            datasets = Dataset.objects.filter(user__isnull=True)[:5]
+            user = None
+            datasets = Dataset.objects.filter(user__isnull=True)
+        keep, _ = Dataset.retention_policy(user)
+        datasets = datasets.annotate(records_count=Count('records'))[:keep]
         
         serializer = DatasetSerializer(datasets, many=True)
         return Response(serializer.data)
@@ -169,7 +427,7 @@ class DatasetDeleteView(APIView):
         try:
             dataset = Dataset.objects.get(pk=pk)
             filename = dataset.filename
-            dataset.delete()
+            Dataset.delete_datasets([dataset.pk])
             return Response(
                 {'message': f'Dataset "{filename}" deleted successfully'},
                 status=status.HTTP_200_OK
@@ -186,27 +444,229 @@ class PDFReportView(APIView):
     Generate and download PDF report for a dataset.
     
     GET /api/report/<id>/
+    GET /api/report/<id>/?full=1  (every record instead of the first 50)
+    GET /api/report/<id>/?layout=summary  (any registered report layout)
     """
     permission_classes = [AllowAny]
     
+    # No Last-Modified: a new REPORT_VERSION changes the PDF but not the upload time
+    @conditional(report_etag)
     def get(self, request, pk):
         try:
             dataset = Dataset.objects.get(pk=pk)
             
-            # Generate PDF
-            pdf_buffer = generate_equipment_report(dataset)
+            not_ready = not_ready_response(dataset)
+            if not_ready:
+                return not_ready
             
-            # Create response
-            response = HttpResponse(pdf_buffer, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="equipment_report_{dataset.id}.pdf"'
+            full = request.query_params.get('full', '').lower() in ('1', 'true')
+            layout = request.query_params.get('layout', DEFAULT_LAYOUT)
             
-            return response
+            # Rendered once per dataset and served from disk afterwards
+            path = get_report(dataset, full=full, layout=layout)
+            
+            return FileResponse(
+                open(path, 'rb'),
+                as_attachment=True,
+                filename=f"equipment_report_{dataset.id}{'_full' if full else ''}.pdf",
+                content_type='application/pdf'
+            )
             
         except Dataset.DoesNotExist:
             return Response(
                 {'error': 'Dataset not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
+class BatchReportView(APIView):
+    """
+    Download the PDF reports of several datasets as one ZIP archive.
+    
+    POST /api/report/batch/  {"dataset_ids": [<id>, ...], "full": false, "layout": "standard"}
+    
+    Uncached reports are rendered in parallel on the process pool and the
+    archive is streamed as each report finishes.
+    """
+    permission_classes = [AllowAny]
+    
+    def post(self, request):
+        ids = request.data.get('dataset_ids')
+        if not isinstance(ids, list) or not ids:
+            return Response(
+                {'error': 'dataset_ids must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        max_datasets = getattr(settings, 'EQUIPMENT_BATCH_REPORT_MAX', 20)
+        if len(ids) > max_datasets:
+            return Response(
+                {'error': f'At most {max_datasets} datasets can be exported at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        full = str(request.data.get('full', '')).lower() in ('1', 'true')
+        layout = request.data.get('layout', DEFAULT_LAYOUT)
+        try:
+            get_layout(layout)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in ids))
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'dataset_ids must be a list of integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        datasets = Dataset.objects.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in datasets]
+        if missing:
+            return Response(
+                {'error': 'Dataset not found', 'details': missing},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        pending = [pk for pk in ids if not datasets[pk].is_ready]
+        if pending:
+            return Response(
+                {'error': 'Some datasets are not ready', 'details': pending},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        content = iter_report_zip([datasets[pk] for pk in ids], full=full, layout=layout)
+        response = StreamingHttpResponse(content, content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="equipment_reports.zip"'
+        return response
+
+
+def job_data(request, job):
+    data = JobSerializer(job).data
+    data['status_url'] = request.build_absolute_uri(reverse('job-status', args=[job.pk]))
+    data['result_url'] = request.build_absolute_uri(reverse('job-result', args=[job.pk]))
+    return data
+
+
+class JobCreateView(APIView):
+    """
+    Queue a background job, e.g. rendering a dataset's PDF report.
+    
+    POST /api/jobs/  {"kind": "report" | "full_report", "dataset_id": <id>}
+    
+    Returns 202 with the job id and URLs to poll its status and fetch
+    its result.
+    """
+    permission_classes = [AllowAny]
+    
+    def post(self, request):
+        kind = request.data.get('kind', 'report')
+        dataset_id = request.data.get('dataset_id')
+        if dataset_id is None:
+            return Response(
+                {'error': 'dataset_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            dataset = Dataset.objects.get(pk=dataset_id)
+        except (Dataset.DoesNotExist, ValueError, TypeError):
+            return Response(
+                {'error': 'Dataset not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        not_ready = not_ready_response(dataset)
+        if not_ready:
+            return not_ready
+        
+        try:
+            user = request.user if request.user.is_authenticated else None
+            job = enqueue_job(kind, dataset=dataset, user=user)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(job_data(request, job), status=status.HTTP_202_ACCEPTED)
+
+
+class JobStatusView(APIView):
+    """
+    Get the status of a background job.
+    
+    GET /api/jobs/<id>/
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request, pk):
+        try:
+            job = Job.objects.get(pk=pk)
+        except Job.DoesNotExist:
+            return Response(
+                {'error': 'Job not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(job_data(request, job))
+
+
+class JobResultView(APIView):
+    """
+    Download the result of a finished job.
+    
+    GET /api/jobs/<id>/result/
+    
+    Returns 409 while the job is queued or running, or if it failed.
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request, pk):
+        try:
+            job = Job.objects.get(pk=pk)
+        except Job.DoesNotExist:
+            return Response(
+                {'error': 'Job not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        if job.status != Job.SUCCEEDED:
+            return Response(
+                {'error': f'Job is {job.status}', 'details': job.error},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        if 'file' not in job.result:
+            return Response(job.result)
+        
+        try:
+            handle = open(job.result['file'], 'rb')
+        except FileNotFoundError:
+            return Response(
+                {'error': 'Job result is no longer available'},
+                status=status.HTTP_410_GONE
+            )
+        return FileResponse(handle, as_attachment=True, filename=job.result.get('filename'))
+
+
+class CacheStatsView(APIView):
+    """
+    Report response cache hit/miss counters.
+    
+    GET /api/cache/stats/
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        return Response(cache_stats())
 
 
 class RegisterView(APIView):
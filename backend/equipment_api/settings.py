@@ -65,6 +65,22 @@ DATABASES = {
     }
 }
 
+# Local-memory LRU cache by default. It is private to each worker process, so
+# the history list is only cached with a shared cache (see
+# EQUIPMENT_CACHE_RESPONSES), e.g.
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#   'LOCATION': BASE_DIR / 'cache',
+# or
+#   'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#   'LOCATION': 'redis://127.0.0.1:6379',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'equipment',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -104,3 +120,74 @@ CORS_ALLOW_CREDENTIALS = True
 # Media files for uploaded CSVs
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Equipment data ingestion
+EQUIPMENT_INGEST_BATCH_SIZE = 5000
+EQUIPMENT_CSV_CHUNK_SIZE = 50000
+# Uploads at least this many bytes are parsed and inserted chunk by chunk
+EQUIPMENT_STREAMING_UPLOAD_THRESHOLD = 10 * 1024 * 1024
+
+# Cursor pagination for /api/data/<id>/
+EQUIPMENT_RECORDS_PAGE_SIZE = 1000
+EQUIPMENT_RECORDS_MAX_PAGE_SIZE = 10000
+
+# Rows fetched per database round trip by the streaming exports
+EQUIPMENT_EXPORT_CHUNK_SIZE = 2000
+
+# Record storage backend: 'rows' (EquipmentRecord rows only) or 'columnar'
+# (memory-mappable column files under MEDIA_ROOT/columns). With 'columnar',
+# EQUIPMENT_KEEP_RECORD_ROWS controls whether rows are written as well;
+# they are only needed for the paginated /api/data/<id>/ endpoint.
+EQUIPMENT_STORAGE_BACKEND = 'rows'
+EQUIPMENT_KEEP_RECORD_ROWS = True
+
+# Dataset retention. KEEP datasets are kept per user (and for anonymous
+# uploads); KEEP_PER_USER overrides it by username. MAX_AGE_DAYS also drops
+# older datasets. DEFERRED runs the cleanup on the background pool after the
+# upload has been committed instead of inside the request.
+EQUIPMENT_RETENTION = {
+    'KEEP': 5,
+    'KEEP_PER_USER': {},
+    'MAX_AGE_DAYS': None,
+    'DEFERRED': False,
+}
+
+# Threads used for deferred work such as retention cleanup
+EQUIPMENT_BACKGROUND_WORKERS = 2
+
+# Response cache for the summary, data and history endpoints. With
+# EQUIPMENT_CACHE_RESPONSES = None the summary and data responses of ready
+# (immutable) datasets are always cached, and history only when
+# EQUIPMENT_CACHE_ALIAS is shared between processes (not LocMem/Dummy), since
+# its invalidation must reach every process. True/False force all on or off.
+EQUIPMENT_CACHE_ALIAS = 'default'
+EQUIPMENT_CACHE_TIMEOUT = 300
+EQUIPMENT_CACHE_RESPONSES = None
+
+# Generated PDF reports are cached under MEDIA_ROOT/reports (or
+# EQUIPMENT_REPORT_CACHE_ROOT). With EQUIPMENT_PRERENDER_REPORTS the report is
+# rendered on the background pool right after each upload.
+EQUIPMENT_PRERENDER_REPORTS = False
+
+# Rows per records table in full PDF reports (?full=1)
+EQUIPMENT_REPORT_TABLE_ROWS = 500
+
+# Batch report export (POST /api/report/batch/): processes rendering reports
+# in parallel and the maximum number of datasets per request
+EQUIPMENT_REPORT_PROCESSES = 2
+EQUIPMENT_BATCH_REPORT_MAX = 20
+
+# Asynchronous uploads: spool the file to MEDIA_ROOT/uploads (or
+# EQUIPMENT_UPLOAD_SPOOL_ROOT), answer 202 and ingest on a dedicated pool of
+# EQUIPMENT_INGEST_WORKERS threads. Per request with ?async=true;
+# EQUIPMENT_ASYNC_UPLOADS makes it the default.
+EQUIPMENT_ASYNC_UPLOADS = False
+EQUIPMENT_INGEST_WORKERS = 2
+EQUIPMENT_PROGRESS_POLL_INTERVAL = 0.5
+
+# Uploads still 'processing' and jobs still queued or running this many
+# seconds after they were created are treated as interrupted (e.g. by a
+# restart) by the cleanup_datasets command, which also deletes finished jobs
+# older than EQUIPMENT_JOB_MAX_AGE_HOURS
+EQUIPMENT_STALE_TASK_SECONDS = 60 * 60
+EQUIPMENT_JOB_MAX_AGE_HOURS = 24
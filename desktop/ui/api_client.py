@@ -0,0 +1,102 @@
+"""
+Shared HTTP client for the Desktop App.
+
+All widgets talk to the backend through one ApiClient (see get_client()),
+which keeps a pooled requests.Session so connections are reused across
+calls, asks for compressed responses, applies default timeouts and
+retries idempotent requests with exponential backoff.
+
+Configuration comes from the environment:
+
+- EQUIPMENT_API_URL: backend base URL (default http://localhost:8000)
+- EQUIPMENT_API_CONNECT_TIMEOUT / EQUIPMENT_API_READ_TIMEOUT: seconds
+"""
+
+import os
+import threading
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_BASE_URL = 'http://localhost:8000'
+
+# Connections kept per host; matches the number of worker threads that can run at once
+POOL_SIZE = 10
+
+try:
+    import brotli  # noqa: F401 - urllib3 decodes br responses when it is installed
+    ACCEPT_ENCODING = 'br, gzip, deflate'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class ApiClient:
+    """
+    Pooled session for the equipment API.
+    
+    Args:
+        base_url: Backend base URL; relative request paths are joined to it
+        timeout: (connect, read) timeout in seconds used when a request
+            does not pass its own
+        retries: Retries for idempotent requests on connection errors and
+            502/503/504 responses
+    """
+    
+    def __init__(self, base_url=None, timeout=None, retries=3):
+        self.base_url = (base_url or os.environ.get('EQUIPMENT_API_URL', DEFAULT_BASE_URL)).rstrip('/') + '/'
+        self.timeout = timeout or (
+            float(os.environ.get('EQUIPMENT_API_CONNECT_TIMEOUT', 5)),
+            float(os.environ.get('EQUIPMENT_API_READ_TIMEOUT', 60)),
+        )
+        
+        # Uploads and job creation are POSTs and are never retried
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=['GET', 'HEAD', 'OPTIONS', 'DELETE'],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+        
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    
+    def url(self, path):
+        """Return an absolute URL for an API path (absolute URLs pass through)."""
+        return urljoin(self.base_url, path.lstrip('/')) if '://' not in path else path
+    
+    def set_token(self, token):
+        """Send (or stop sending) the auth token with every request."""
+        if token:
+            self.session.headers['Authorization'] = f'Token {token}'
+        else:
+            self.session.headers.pop('Authorization', None)
+    
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, self.url(path), **kwargs)
+    
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+    
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the application-wide ApiClient, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ApiClient()
+        return _client
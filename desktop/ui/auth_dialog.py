@@ -10,6 +10,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 
+from .api_client import get_client
+
 
 class AuthDialog(QDialog):
     def __init__(self, parent=None):
@@ -108,8 +110,8 @@ class AuthDialog(QDialog):
             return
         
         try:
-            response = requests.post(
-                'http://localhost:8000/api/auth/login/',
+            response = get_client().post(
+                '/api/auth/login/',
                 json={'username': username, 'password': password}
             )
             
@@ -142,8 +144,8 @@ class AuthDialog(QDialog):
             return
         
         try:
-            response = requests.post(
-                'http://localhost:8000/api/auth/register/',
+            response = get_client().post(
+                '/api/auth/register/',
                 json={'username': username, 'email': email, 'password': password}
             )
             
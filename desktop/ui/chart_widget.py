@@ -1,11 +1,109 @@
 """
 Chart Widget using Matplotlib for the Desktop App.
+
+Each widget builds its axes and artists once and later calls only update
+their data. Data artists are animated and drawn by a BlitManager over a
+cached background, so switching datasets repaints just those artists.
+A full (idle) redraw is requested only when something in the background
+changes, such as axis limits or tick labels.
 """
 
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+from matplotlib.patches import Wedge
+from matplotlib.ticker import MaxNLocator
+import numpy as np
+
+
+BACKGROUND = '#1e293b'
+TEXT_COLOR = '#f1f5f9'
+MUTED_COLOR = '#94a3b8'
+AXIS_COLOR = '#475569'
+
+PIE_COLORS = ['#3b82f6', '#10b981', '#8b5cf6', '#f59e0b', '#ef4444', '#06b6d4', '#ec4899', '#22c55e']
+BAR_COLORS = ['#3b82f6', '#10b981', '#f59e0b']
+
+
+class BlitManager:
+    """
+    Redraw animated artists over a cached copy of the rest of the canvas.
+    
+    The background is captured on every full draw (first show, resize,
+    draw_idle), after which update() only restores it and draws the
+    registered artists.
+    """
+    
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.artists = []
+        self.background = None
+        canvas.mpl_connect('draw_event', self.on_draw)
+    
+    def add(self, artist):
+        artist.set_animated(True)
+        self.artists.append(artist)
+        return artist
+    
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.draw_artists()
+    
+    def draw_artists(self):
+        for artist in self.artists:
+            self.canvas.figure.draw_artist(artist)
+    
+    def update(self, full=False):
+        if full or self.background is None:
+            # on_draw repaints the artists once the background is redrawn
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+
+def create_canvas(widget, figsize):
+    """Add a dark figure canvas to widget and return (figure, canvas)."""
+    layout = QVBoxLayout(widget)
+    layout.setContentsMargins(0, 0, 0, 0)
+    
+    figure = Figure(figsize=figsize, dpi=100, facecolor=BACKGROUND)
+    canvas = FigureCanvas(figure)
+    canvas.setStyleSheet(f"background-color: {BACKGROUND}; border-radius: 8px;")
+    
+    layout.addWidget(canvas)
+    return figure, canvas
+
+
+def style_axes(ax, title):
+    """Apply the dark theme used by the cartesian charts."""
+    ax.set_facecolor(BACKGROUND)
+    ax.set_title(title, color=TEXT_COLOR, fontsize=12, fontweight='bold', pad=10)
+    ax.tick_params(colors=MUTED_COLOR)
+    ax.spines['bottom'].set_color(AXIS_COLOR)
+    ax.spines['left'].set_color(AXIS_COLOR)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.yaxis.grid(True, linestyle='--', alpha=0.3, color=AXIS_COLOR)
+    ax.set_axisbelow(True)
+
+
+def nice_upper_limit(value):
+    """Round an axis maximum up to a tick, so similar datasets share limits."""
+    return MaxNLocator(nbins=5).tick_values(0, max(value, 1e-9))[-1]
+
+
+def nice_limits(values, margin):
+    """
+    Return (bottom, top) for an axis starting at 0 that fits values.
+    
+    The axis only extends below 0 when some value is negative (such as a
+    sub-zero temperature); both ends are rounded out with nice_upper_limit.
+    """
+    low = min(values, default=0)
+    bottom = -nice_upper_limit(-low * margin) if low < 0 else 0
+    return bottom, nice_upper_limit(max(values, default=0) * margin)
 
 
 class ChartWidget(QWidget):
@@ -16,92 +114,121 @@ class ChartWidget(QWidget):
         self.init_ui()
     
     def init_ui(self):
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        
         # Create matplotlib figure with dark theme
-        self.figure = Figure(figsize=(5, 4), dpi=100, facecolor='#1e293b')
-        self.canvas = FigureCanvas(self.figure)
-        self.canvas.setStyleSheet("background-color: #1e293b; border-radius: 8px;")
+        self.figure, self.canvas = create_canvas(self, (5, 4))
+        self.blit = BlitManager(self.canvas)
         
-        layout.addWidget(self.canvas)
-    
-    def set_data(self, data):
-        """Set data for pie chart (type distribution)."""
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.set_facecolor('#1e293b')
-        
-        if not data:
-            ax.text(0.5, 0.5, 'No data', ha='center', va='center', 
-                   color='#94a3b8', fontsize=14)
-            self.canvas.draw()
-            return
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_facecolor(BACKGROUND)
+        self.empty_text = self.blit.add(self.ax.text(
+            0.5, 0.5, 'No data', ha='center', va='center',
+            color=MUTED_COLOR, fontsize=14, transform=self.ax.transAxes, visible=False
+        ))
         
-        labels = list(data.keys())
-        values = list(data.values())
+        if self.chart_type == 'bar':
+            self.init_bar()
+        else:
+            self.init_pie()
+    
+    def init_pie(self):
+        self.figure.subplots_adjust(left=0.05, right=0.95, top=0.88, bottom=0.05)
+        self.ax.set_title(self.title, color=TEXT_COLOR, fontsize=12, fontweight='bold', pad=10)
+        self.ax.set_aspect('equal')
+        self.ax.set_xlim(-1.35, 1.35)
+        self.ax.set_ylim(-1.25, 1.25)
+        self.ax.axis('off')
         
-        colors = ['#3b82f6', '#10b981', '#8b5cf6', '#f59e0b', '#ef4444', '#06b6d4', '#ec4899', '#22c55e']
+        # (wedge, label, percentage) per category; grown on demand, hidden when unused
+        self.slices = []
+    
+    def add_slice(self):
+        color = PIE_COLORS[len(self.slices) % len(PIE_COLORS)]
+        wedge = self.blit.add(Wedge((0, 0), 1, 0, 0, facecolor=color, edgecolor=BACKGROUND, linewidth=2))
+        self.ax.add_patch(wedge)
+        label = self.blit.add(self.ax.text(0, 0, '', va='center', color=TEXT_COLOR, fontsize=10))
+        pct = self.blit.add(self.ax.text(0, 0, '', ha='center', va='center', color=TEXT_COLOR, fontsize=9))
+        self.slices.append((wedge, label, pct))
+    
+    def init_bar(self):
+        self.figure.subplots_adjust(left=0.14, right=0.95, top=0.88, bottom=0.1)
+        style_axes(self.ax, self.title)
         
-        wedges, texts, autotexts = ax.pie(
-            values, 
-            labels=labels, 
-            autopct='%1.1f%%',
-            colors=colors[:len(values)],
-            textprops={'color': '#f1f5f9', 'fontsize': 10},
-            wedgeprops={'edgecolor': '#1e293b', 'linewidth': 2}
-        )
+        self.bar_labels = []
+        self.bars = self.ax.bar(range(len(BAR_COLORS)), [0] * len(BAR_COLORS), color=BAR_COLORS, edgecolor='#0f172a', linewidth=1)
+        self.bar_values = []
+        for bar in self.bars:
+            self.blit.add(bar)
+            self.bar_values.append(self.blit.add(self.ax.annotate(
+                '', xy=(bar.get_x() + bar.get_width() / 2, 0),
+                xytext=(0, 3), textcoords="offset points",
+                ha='center', va='bottom', color=TEXT_COLOR, fontsize=10
+            )))
+        self.ax.set_xticks(range(len(self.bars)))
+    
+    def set_data(self, data):
+        """Set data for pie chart (type distribution)."""
+        data = data or {}
+        values = np.array(list(data.values()), dtype=float)
+        total = values.sum()
+        self.empty_text.set_visible(not total)
         
-        for autotext in autotexts:
-            autotext.set_color('#f1f5f9')
-            autotext.set_fontsize(9)
+        while len(self.slices) < len(values):
+            self.add_slice()
         
-        ax.set_title(self.title, color='#f1f5f9', fontsize=12, fontweight='bold', pad=10)
+        # Same geometry as Axes.pie: counter-clockwise from 0°, labels at 1.1r, percentages at 0.6r
+        theta = 0.0
+        for i, (wedge, label, pct) in enumerate(self.slices):
+            visible = bool(total) and i < len(values)
+            for artist in (wedge, label, pct):
+                artist.set_visible(visible)
+            if not visible:
+                continue
+            
+            span = 360.0 * values[i] / total
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + span)
+            
+            mid = np.deg2rad(theta + span / 2)
+            x, y = np.cos(mid), np.sin(mid)
+            label.set_text(str(list(data.keys())[i]))
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            pct.set_text(f'{100.0 * values[i] / total:.1f}%')
+            pct.set_position((0.6 * x, 0.6 * y))
+            theta += span
         
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self.blit.update()
     
     def set_bar_data(self, data):
         """Set data for bar chart (averages)."""
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.set_facecolor('#1e293b')
-        
-        if not data:
-            ax.text(0.5, 0.5, 'No data', ha='center', va='center', 
-                   color='#94a3b8', fontsize=14)
-            self.canvas.draw()
-            return
-        
-        labels = list(data.keys())
-        values = list(data.values())
-        colors = ['#3b82f6', '#10b981', '#f59e0b']
-        
-        bars = ax.bar(labels, values, color=colors, edgecolor='#0f172a', linewidth=1)
+        data = data or {}
+        labels = list(data.keys())[:len(self.bars)]
+        values = [float(v or 0) for v in list(data.values())[:len(self.bars)]]
+        self.empty_text.set_visible(not values)
         
-        # Add value labels on bars
-        for bar, val in zip(bars, values):
-            height = bar.get_height()
-            ax.annotate(f'{val:.1f}',
-                       xy=(bar.get_x() + bar.get_width() / 2, height),
-                       xytext=(0, 3),
-                       textcoords="offset points",
-                       ha='center', va='bottom',
-                       color='#f1f5f9', fontsize=10)
+        for i, (bar, value_label) in enumerate(zip(self.bars, self.bar_values)):
+            visible = i < len(values)
+            bar.set_visible(visible)
+            value_label.set_visible(visible)
+            if visible:
+                bar.set_height(values[i])
+                value_label.set_text(f'{values[i]:.1f}')
+                # Above the bar, or above the zero line for negative values
+                value_label.xy = (bar.get_x() + bar.get_width() / 2, max(values[i], 0))
         
-        ax.set_title(self.title, color='#f1f5f9', fontsize=12, fontweight='bold', pad=10)
-        ax.tick_params(colors='#94a3b8')
-        ax.spines['bottom'].set_color('#475569')
-        ax.spines['left'].set_color('#475569')
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
+        # Limits and tick labels live in the cached background; only redraw it when they change
+        full = False
+        limits = nice_limits(values, 1.15)
+        if self.ax.get_ylim() != limits:
+            self.ax.set_ylim(*limits)
+            full = True
+        if labels != self.bar_labels:
+            self.ax.set_xticks(range(len(labels)))
+            self.ax.set_xticklabels(labels)
+            self.bar_labels = labels
+            full = True
         
-        # Grid
-        ax.yaxis.grid(True, linestyle='--', alpha=0.3, color='#475569')
-        ax.set_axisbelow(True)
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self.blit.update(full)
 
 
 class LineChartWidget(QWidget):
@@ -113,53 +240,52 @@ class LineChartWidget(QWidget):
         self.init_ui()
     
     def init_ui(self):
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
+        self.figure, self.canvas = create_canvas(self, (8, 4))
+        self.blit = BlitManager(self.canvas)
         
-        self.figure = Figure(figsize=(8, 4), dpi=100, facecolor='#1e293b')
-        self.canvas = FigureCanvas(self.figure)
-        self.canvas.setStyleSheet("background-color: #1e293b; border-radius: 8px;")
+        self.ax = self.figure.add_subplot(111)
+        self.figure.subplots_adjust(left=0.08, right=0.97, top=0.9, bottom=0.25)
+        style_axes(self.ax, self.title)
         
-        layout.addWidget(self.canvas)
+        self.empty_text = self.blit.add(self.ax.text(
+            0.5, 0.5, 'No data', ha='center', va='center',
+            color=MUTED_COLOR, fontsize=14, transform=self.ax.transAxes, visible=False
+        ))
+        self.lines = {
+            'flowrate': self.ax.plot([], [], 'o-', label='Flowrate', color='#3b82f6', linewidth=2, markersize=6)[0],
+            'pressure': self.ax.plot([], [], 's-', label='Pressure', color='#10b981', linewidth=2, markersize=6)[0],
+            'temperature': self.ax.plot([], [], '^-', label='Temperature', color='#f59e0b', linewidth=2, markersize=6)[0],
+        }
+        for line in self.lines.values():
+            self.blit.add(line)
+        self.ax.legend(facecolor='#334155', edgecolor=AXIS_COLOR, labelcolor=TEXT_COLOR)
+        self.names = None
     
     def set_data(self, records):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.set_facecolor('#1e293b')
-        
-        if not records:
-            ax.text(0.5, 0.5, 'No data', ha='center', va='center', 
-                   color='#94a3b8', fontsize=14)
-            self.canvas.draw()
-            return
-        
         # Limit to first 15 records for readability
-        records = records[:15]
+        records = (records or [])[:15]
+        self.empty_text.set_visible(not records)
         
-        names = [r.get('equipment_name', '')[:10] for r in records]
-        flowrates = [r.get('flowrate', 0) for r in records]
-        pressures = [r.get('pressure', 0) for r in records]
-        temperatures = [r.get('temperature', 0) for r in records]
-        
-        x = range(len(names))
-        
-        ax.plot(x, flowrates, 'o-', label='Flowrate', color='#3b82f6', linewidth=2, markersize=6)
-        ax.plot(x, pressures, 's-', label='Pressure', color='#10b981', linewidth=2, markersize=6)
-        ax.plot(x, temperatures, '^-', label='Temperature', color='#f59e0b', linewidth=2, markersize=6)
+        x = np.arange(len(records))
+        values = []
+        for key, line in self.lines.items():
+            y = np.array([r.get(key, 0) or 0 for r in records], dtype=float)
+            line.set_data(x, y)
+            values.append(y)
         
-        ax.set_xticks(x)
-        ax.set_xticklabels(names, rotation=45, ha='right')
-        
-        ax.set_title(self.title, color='#f1f5f9', fontsize=12, fontweight='bold', pad=10)
-        ax.tick_params(colors='#94a3b8')
-        ax.spines['bottom'].set_color('#475569')
-        ax.spines['left'].set_color('#475569')
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
+        full = False
+        names = [r.get('equipment_name', '')[:10] for r in records]
+        if names != self.names:
+            self.ax.set_xticks(x)
+            self.ax.set_xticklabels(names, rotation=45, ha='right')
+            self.names = names
+            full = True
         
-        ax.legend(facecolor='#334155', edgecolor='#475569', labelcolor='#f1f5f9')
-        ax.yaxis.grid(True, linestyle='--', alpha=0.3, color='#475569')
-        ax.set_axisbelow(True)
+        points = [v for y in values if y.size for v in (y.min(), y.max())]
+        limits = (-0.5, max(len(records) - 0.5, 0.5)) + nice_limits(points, 1.1)
+        if self.ax.get_xlim() + self.ax.get_ylim() != limits:
+            self.ax.set_xlim(*limits[:2])
+            self.ax.set_ylim(*limits[2:])
+            full = True
         
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self.blit.update(full)
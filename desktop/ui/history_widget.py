@@ -2,26 +2,30 @@
 History Widget for the Desktop App.
 """
 
-import requests
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-    QPushButton, QListWidget, QListWidgetItem, QMessageBox,
-    QFileDialog
+    QPushButton, QListWidget, QListWidgetItem, QMessageBox
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 
+from .workers import start_request
+
 
 class HistoryWidget(QWidget):
     dataset_selected = pyqtSignal(dict)
     
     def __init__(self):
         super().__init__()
-        self.token = None
         self.datasets = []
+        # url -> (ETag, parsed body) for conditional revisits
+        self.response_cache = {}
+        # Running request workers, kept alive until they report back
+        self.workers = set()
         self.init_ui()
     
-    def set_token(self, token):
-        self.token = token
+    def clear_cache(self):
+        """Forget cached responses, e.g. when the logged-in user changes."""
+        self.response_cache.clear()
     
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -50,33 +54,50 @@ class HistoryWidget(QWidget):
         layout.addWidget(self.list_widget)
         
         # Info
-        info = QLabel("💡 The system keeps the last 5 uploaded datasets. Double-click to view dashboard.")
+        info = QLabel("💡 Only your most recent datasets are kept, as set by the server's retention policy. Double-click to view dashboard.")
         info.setStyleSheet("color: #64748b; font-size: 12px;")
         info.setAlignment(Qt.AlignCenter)
         layout.addWidget(info)
     
+    def get_json(self, url, on_success):
+        """
+        GET a JSON endpoint on a worker thread, revalidating any cached copy with If-None-Match.
+        
+        on_success is called with the parsed body on 200, or with the
+        cached body on 304; any other status is reported in a message box.
+        """
+        headers = {}
+        cached = self.response_cache.get(url)
+        if cached:
+            headers['If-None-Match'] = cached[0]
+        
+        def finished(response):
+            self.workers.discard(worker)
+            if response.status_code == 304 and cached:
+                on_success(cached[1])
+            elif response.status_code == 200:
+                data = response.json()
+                etag = response.headers.get('ETag')
+                if etag:
+                    self.response_cache[url] = (etag, data)
+                on_success(data)
+            else:
+                data = response.json() or {}
+                QMessageBox.warning(self, "Error", data.get('error', f'Request failed ({response.status_code})'))
+        
+        def failed(message):
+            self.workers.discard(worker)
+            QMessageBox.warning(self, "Connection Error", message)
+        
+        worker = start_request('GET', url, headers=headers, on_finished=finished, on_error=failed)
+        self.workers.add(worker)
+    
     def refresh(self):
-        try:
-            headers = {}
-            if self.token:
-                headers['Authorization'] = f'Token {self.token}'
-            
-            response = requests.get(
-                'http://localhost:8000/api/history/',
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                self.datasets = response.json()
-                self.update_list()
-        except requests.exceptions.ConnectionError:
-            QMessageBox.warning(
-                self, 
-                "Connection Error", 
-                "Cannot connect to the server. Make sure the backend is running."
-            )
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
+        self.get_json('/api/history/', self.on_history_loaded)
+    
+    def on_history_loaded(self, data):
+        self.datasets = data
+        self.update_list()
     
     def update_list(self):
         self.list_widget.clear()
@@ -107,20 +128,14 @@ class HistoryWidget(QWidget):
         if not dataset_summary:
             return
         
-        # Fetch full dataset data
-        try:
-            headers = {}
-            if self.token:
-                headers['Authorization'] = f'Token {self.token}'
-            
-            dataset_id = dataset_summary.get('id')
-            response = requests.get(
-                f'http://localhost:8000/api/data/{dataset_id}/',
-                headers=headers
+        # Summary first, then every record as columns (this works for row
+        # and column storage alike, and is never cut off at a page size)
+        dataset_id = dataset_summary.get('id')
+        
+        def on_summary(summary):
+            self.get_json(
+                f'/api/columns/{dataset_id}/?format=json',
+                lambda columns: self.dataset_selected.emit(dict(summary, columns=columns))
             )
-            
-            if response.status_code == 200:
-                dataset = response.json()
-                self.dataset_selected.emit(dataset)
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
+        
+        self.get_json(f'/api/summary/{dataset_id}/', on_summary)
@@ -4,15 +4,17 @@ Main Window for the Chemical Equipment Visualizer Desktop App.
 
 from PyQt5.QtWidgets import (
     QMainWindow, QTabWidget, QWidget, QVBoxLayout, 
-    QHBoxLayout, QLabel, QPushButton, QStatusBar
+    QHBoxLayout, QLabel, QPushButton, QStatusBar, QStackedWidget
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
 
 from .upload_widget import UploadWidget
 from .chart_widget import ChartWidget
 from .table_widget import TableWidget
 from .auth_dialog import AuthDialog
+from .api_client import get_client
+from .workers import start_request
 
 
 class MainWindow(QMainWindow):
@@ -22,6 +24,13 @@ class MainWindow(QMainWindow):
         self.token = None
         self.user = None
         
+        # Report job being polled by download_pdf, and its in-flight request
+        self.report_job = None
+        self.report_worker = None
+        self.report_timer = QTimer(self)
+        self.report_timer.setInterval(500)
+        self.report_timer.timeout.connect(self.poll_report_job)
+        
         self.init_ui()
     
     def init_ui(self):
@@ -49,7 +58,10 @@ class MainWindow(QMainWindow):
         self.upload_widget = UploadWidget()
         self.upload_widget.upload_success.connect(self.on_upload_success)
         
-        self.dashboard_widget = self.create_dashboard_placeholder()
+        # The dashboard is built on first use and then rebound to each selected dataset
+        self.dashboard = None
+        self.dashboard_widget = QStackedWidget()
+        self.dashboard_widget.addWidget(self.create_dashboard_placeholder())
         self.history_widget = self.create_history_widget()
         
         self.tabs.addTab(self.upload_widget, "📤 Upload")
@@ -137,9 +149,9 @@ class MainWindow(QMainWindow):
         if dialog.exec_():
             self.user = dialog.user
             self.token = dialog.token
+            get_client().set_token(self.token)
             self.update_auth_display()
-            self.upload_widget.set_token(self.token)
-            self.history_widget.set_token(self.token)
+            self.history_widget.clear_cache()
             self.history_widget.refresh()
     
     def update_auth_display(self):
@@ -158,8 +170,8 @@ class MainWindow(QMainWindow):
     def logout(self):
         self.user = None
         self.token = None
-        self.upload_widget.set_token(None)
-        self.history_widget.set_token(None)
+        get_client().set_token(None)
+        self.history_widget.clear_cache()
         self.update_auth_display()
         self.statusBar.showMessage("Logged out successfully")
     
@@ -175,52 +187,61 @@ class MainWindow(QMainWindow):
         self.update_dashboard(dataset)
         self.tabs.setCurrentIndex(1)  # Switch to dashboard
     
-    def update_dashboard(self, dataset):
-        # Remove placeholder and create actual dashboard
-        self.tabs.removeTab(1)
-        
+    def create_dashboard(self):
         dashboard = QWidget()
         layout = QVBoxLayout(dashboard)
         layout.setSpacing(16)
         
         # Stats section
-        stats_widget = self.create_stats_widget(dataset)
-        layout.addWidget(stats_widget)
+        layout.addWidget(self.create_stats_widget())
         
         # Charts section
         charts_layout = QHBoxLayout()
         
         # Pie chart
-        pie_chart = ChartWidget("Equipment Type Distribution", "pie")
-        pie_chart.set_data(dataset.get('type_distribution', {}))
-        charts_layout.addWidget(pie_chart)
+        self.pie_chart = ChartWidget("Equipment Type Distribution", "pie")
+        charts_layout.addWidget(self.pie_chart)
         
         # Bar chart
-        bar_chart = ChartWidget("Average Parameter Values", "bar")
-        bar_chart.set_bar_data({
-            'Flowrate': dataset.get('avg_flowrate', 0),
-            'Pressure': dataset.get('avg_pressure', 0),
-            'Temperature': dataset.get('avg_temperature', 0)
-        })
-        charts_layout.addWidget(bar_chart)
+        self.bar_chart = ChartWidget("Average Parameter Values", "bar")
+        charts_layout.addWidget(self.bar_chart)
         
         layout.addLayout(charts_layout)
         
         # Table section
-        table_widget = TableWidget()
-        table_widget.set_data(dataset.get('records', []))
-        layout.addWidget(table_widget)
+        self.table_widget = TableWidget()
+        layout.addWidget(self.table_widget)
         
         # PDF button
         pdf_btn = QPushButton("📄 Download PDF Report")
         pdf_btn.setObjectName("successBtn")
-        pdf_btn.clicked.connect(lambda: self.download_pdf(dataset.get('id')))
+        pdf_btn.clicked.connect(lambda: self.download_pdf((self.current_dataset or {}).get('id')))
         layout.addWidget(pdf_btn)
         
-        self.tabs.insertTab(1, dashboard, "📊 Dashboard")
+        return dashboard
+    
+    def update_dashboard(self, dataset):
+        """Show dataset on the dashboard, reusing its widgets from earlier selections."""
+        if self.dashboard is None:
+            self.dashboard = self.create_dashboard()
+            self.dashboard_widget.addWidget(self.dashboard)
+        
+        self.update_stats(dataset)
+        self.pie_chart.set_data(dataset.get('type_distribution', {}))
+        self.bar_chart.set_bar_data({
+            'Flowrate': dataset.get('avg_flowrate', 0),
+            'Pressure': dataset.get('avg_pressure', 0),
+            'Temperature': dataset.get('avg_temperature', 0)
+        })
+        if 'columns' in dataset:
+            self.table_widget.set_columns(dataset['columns'])
+        else:
+            self.table_widget.set_data(dataset.get('records', []))
+        
+        self.dashboard_widget.setCurrentWidget(self.dashboard)
         self.tabs.setCurrentIndex(1)
     
-    def create_stats_widget(self, dataset):
+    def create_stats_widget(self):
         widget = QWidget()
         widget.setStyleSheet("""
             QWidget {
@@ -231,19 +252,26 @@ class MainWindow(QMainWindow):
         """)
         layout = QHBoxLayout(widget)
         
+        # (label, color, formatter) per card; update_stats fills in the values
         stats = [
-            ("Total Equipment", str(dataset.get('total_count', 0)), "#3b82f6"),
-            ("Avg Flowrate", f"{dataset.get('avg_flowrate', 0):.1f} L/min", "#10b981"),
-            ("Avg Pressure", f"{dataset.get('avg_pressure', 0):.1f} bar", "#8b5cf6"),
-            ("Avg Temperature", f"{dataset.get('avg_temperature', 0):.1f} °C", "#f59e0b"),
+            ("Total Equipment", "#3b82f6", lambda d: str(d.get('total_count', 0))),
+            ("Avg Flowrate", "#10b981", lambda d: f"{d.get('avg_flowrate', 0):.1f} L/min"),
+            ("Avg Pressure", "#8b5cf6", lambda d: f"{d.get('avg_pressure', 0):.1f} bar"),
+            ("Avg Temperature", "#f59e0b", lambda d: f"{d.get('avg_temperature', 0):.1f} °C"),
         ]
         
-        for label, value, color in stats:
-            stat_card = self.create_stat_card(label, value, color)
+        self.stat_values = []
+        for label, color, formatter in stats:
+            stat_card, value_label = self.create_stat_card(label, "", color)
+            self.stat_values.append((value_label, formatter))
             layout.addWidget(stat_card)
         
         return widget
     
+    def update_stats(self, dataset):
+        for value_label, formatter in self.stat_values:
+            value_label.setText(formatter(dataset))
+    
     def create_stat_card(self, label, value, color):
         card = QWidget()
         card.setStyleSheet(f"""
@@ -266,40 +294,96 @@ class MainWindow(QMainWindow):
         label_widget.setAlignment(Qt.AlignCenter)
         layout.addWidget(label_widget)
         
-        return card
+        return card, value_label
     
     def download_pdf(self, dataset_id):
-        if not dataset_id:
+        """Queue a report job on the server; poll_report_job saves it when ready."""
+        if not dataset_id or self.report_job:
+            return
+        
+        self.report_job = {'dataset_id': dataset_id}
+        self.statusBar.showMessage("Generating PDF report...")
+        self.report_worker = start_request(
+            'POST', '/api/jobs/',
+            json_body={'kind': 'report', 'dataset_id': dataset_id},
+            on_finished=self.on_report_job_created,
+            on_error=self.on_report_error
+        )
+    
+    def on_report_job_created(self, response):
+        self.report_worker = None
+        if response.status_code != 202:
+            self.on_report_error("Failed to generate PDF report")
+            return
+        self.report_job.update(response.json())
+        self.report_timer.start()
+    
+    def poll_report_job(self):
+        # Skip a tick while the previous status request is still running
+        if self.report_worker:
+            return
+        self.report_worker = start_request(
+            'GET', self.report_job['status_url'],
+            on_finished=self.on_report_status,
+            on_error=self.on_report_error
+        )
+    
+    def on_report_status(self, response):
+        from PyQt5.QtWidgets import QFileDialog
+        
+        self.report_worker = None
+        status = response.json().get('status') if response.status_code == 200 else 'failed'
+        if status in ('queued', 'running'):
+            return
+        
+        self.report_timer.stop()
+        if status != 'succeeded':
+            self.on_report_error("Failed to generate PDF report")
+            return
+        
+        job = self.report_job
+        
+        # Save file
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Save PDF Report", 
+            f"equipment_report_{job['dataset_id']}.pdf",
+            "PDF Files (*.pdf)"
+        )
+        
+        if not filename:
+            self.report_job = None
+            self.statusBar.showMessage("PDF report download cancelled")
             return
         
-        import requests
-        from PyQt5.QtWidgets import QFileDialog, QMessageBox
-        
-        try:
-            headers = {}
-            if self.token:
-                headers['Authorization'] = f'Token {self.token}'
-            
-            response = requests.get(
-                f'http://localhost:8000/api/report/{dataset_id}/',
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                # Save file
-                filename, _ = QFileDialog.getSaveFileName(
-                    self, "Save PDF Report", 
-                    f"equipment_report_{dataset_id}.pdf",
-                    "PDF Files (*.pdf)"
-                )
-                
-                if filename:
-                    with open(filename, 'wb') as f:
-                        f.write(response.content)
-                    
-                    QMessageBox.information(self, "Success", f"Report saved to {filename}")
-                    self.statusBar.showMessage(f"PDF report saved successfully")
-            else:
-                QMessageBox.warning(self, "Error", "Failed to generate PDF report")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Error: {str(e)}")
+        self.report_worker = start_request(
+            'GET', job['result_url'],
+            download_path=filename,
+            on_progress=self.on_report_progress,
+            on_finished=lambda result: self.on_report_downloaded(filename, result),
+            on_error=self.on_report_error
+        )
+    
+    def on_report_progress(self, received, total):
+        if total:
+            self.statusBar.showMessage(f"Downloading PDF report... {received * 100 // total}%")
+    
+    def on_report_downloaded(self, filename, response):
+        from PyQt5.QtWidgets import QMessageBox
+        
+        self.report_worker = None
+        self.report_job = None
+        if response.status_code != 200:
+            self.on_report_error("Failed to download PDF report")
+            return
+        
+        QMessageBox.information(self, "Success", f"Report saved to {filename}")
+        self.statusBar.showMessage(f"PDF report saved successfully")
+    
+    def on_report_error(self, message):
+        from PyQt5.QtWidgets import QMessageBox
+        
+        self.report_timer.stop()
+        self.report_worker = None
+        self.report_job = None
+        self.statusBar.showMessage("PDF report failed")
+        QMessageBox.warning(self, "Error", message)
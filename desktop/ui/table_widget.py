@@ -1,12 +1,136 @@
 """
 Data Table Widget for the Desktop App.
+
+Records are held as NumPy column arrays in RecordTableModel and shown in a
+QTableView, so only the rows currently on screen are ever formatted.
+Sorting and filtering reorder an array of row indices instead of the data
+itself, which keeps both vectorized and independent of the view.
 """
 
+import numpy as np
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
-    QHeaderView, QLabel, QHBoxLayout
+    QWidget, QVBoxLayout, QTableView, QHeaderView,
+    QLabel, QHBoxLayout, QLineEdit, QAbstractItemView
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+
+# (header, record key, display format); text columns have no format
+COLUMNS = [
+    ("Equipment Name", 'equipment_name', None),
+    ("Type", 'equipment_type', None),
+    ("Flowrate (L/min)", 'flowrate', '{:.1f}'),
+    ("Pressure (bar)", 'pressure', '{:.1f}'),
+    ("Temperature (°C)", 'temperature', '{:.1f}'),
+]
+
+ROW_HEIGHT = 28
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    Read-only table model over equipment records stored column-wise.
+    
+    self.rows maps view rows to positions in the column arrays; sort() and
+    set_filter() only ever rebuild that index array.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns = [np.array([], dtype=str if fmt is None else float) for _, _, fmt in COLUMNS]
+        self.rows = np.arange(0)
+        self.filter_text = ''
+        self.sort_column = None
+        self.sort_order = Qt.AscendingOrder
+        self._search = None
+    
+    def set_records(self, records):
+        """Replace the model contents with a list of record dicts."""
+        self.set_columns({key: [r.get(key) for r in records] for _, key, _ in COLUMNS})
+    
+    def set_columns(self, columns):
+        """
+        Replace the model contents with one sequence per field.
+        
+        Args:
+            columns: Dict keyed by record field, as returned by
+                /api/columns/<id>/?format=json
+        """
+        self.beginResetModel()
+        self.columns = []
+        for _, key, fmt in COLUMNS:
+            values = columns.get(key) or []
+            if fmt is None:
+                values = np.array(['' if v is None else str(v) for v in values], dtype=str)
+            else:
+                values = np.nan_to_num(np.array(values, dtype=float))
+            self.columns.append(values)
+        self._search = None
+        self.rows = self._visible_rows()
+        self.endResetModel()
+    
+    def total_count(self):
+        return len(self.columns[0])
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][0]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        
+        if role == Qt.DisplayRole:
+            value = self.columns[column][self.rows[index.row()]]
+            fmt = COLUMNS[column][2]
+            return str(value) if fmt is None else fmt.format(value)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignVCenter | (Qt.AlignLeft if column == 0 else Qt.AlignCenter)
+        if role == Qt.ForegroundRole and column == 0:
+            return QColor(Qt.white)
+        return None
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.sort_column = column if column >= 0 else None
+        self.sort_order = order
+        self.rows = self._visible_rows()
+        self.layoutChanged.emit()
+    
+    def set_filter(self, text):
+        """Show only records whose name or type contains text (case-insensitive)."""
+        self.beginResetModel()
+        self.filter_text = text.strip().lower()
+        self.rows = self._visible_rows()
+        self.endResetModel()
+    
+    def _visible_rows(self):
+        rows = np.arange(self.total_count())
+        
+        if self.filter_text:
+            if self._search is None:
+                # Lower-cased "name<TAB>type" per record, built once per data set
+                self._search = np.char.lower(np.char.add(np.char.add(self.columns[0], '\t'), self.columns[1]))
+            rows = rows[np.char.find(self._search, self.filter_text) >= 0]
+        
+        if self.sort_column is not None:
+            keys = self.columns[self.sort_column][rows]
+            if self.sort_order == Qt.DescendingOrder:
+                # Reverse, stable-sort, reverse back: descending but ties keep their order
+                rows = rows[::-1][np.argsort(keys[::-1], kind='stable')][::-1]
+            else:
+                rows = rows[np.argsort(keys, kind='stable')]
+        
+        return rows
 
 
 class TableWidget(QWidget):
@@ -24,69 +148,54 @@ class TableWidget(QWidget):
         title.setStyleSheet("font-size: 16px; font-weight: bold; color: #f1f5f9;")
         header_layout.addWidget(title)
         
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter by name or type...")
+        self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.setMaximumWidth(240)
+        self.filter_input.textChanged.connect(self.on_filter_changed)
+        
         self.count_label = QLabel("0 records")
         self.count_label.setStyleSheet("color: #94a3b8;")
         header_layout.addStretch()
+        header_layout.addWidget(self.filter_input)
         header_layout.addWidget(self.count_label)
         
         layout.addLayout(header_layout)
         
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            "Equipment Name", "Type", "Flowrate (L/min)", 
-            "Pressure (bar)", "Temperature (°C)"
-        ])
+        self.model = RecordTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         
-        # Table settings
+        # Table settings; fixed row heights keep layout independent of the row count
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(ROW_HEIGHT)
         self.table.verticalHeader().setVisible(False)
+        self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
         
         layout.addWidget(self.table)
     
     def set_data(self, records):
-        self.table.setRowCount(0)
-        
-        if not records:
-            self.count_label.setText("0 records")
-            return
-        
-        self.count_label.setText(f"{len(records)} records")
-        
-        for record in records:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            # Equipment Name
-            name_item = QTableWidgetItem(record.get('equipment_name', ''))
-            name_item.setForeground(Qt.white)
-            self.table.setItem(row, 0, name_item)
-            
-            # Type (with badge styling)
-            type_item = QTableWidgetItem(record.get('equipment_type', ''))
-            type_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 1, type_item)
-            
-            # Flowrate
-            flowrate = record.get('flowrate', 0)
-            flow_item = QTableWidgetItem(f"{flowrate:.1f}")
-            flow_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 2, flow_item)
-            
-            # Pressure
-            pressure = record.get('pressure', 0)
-            press_item = QTableWidgetItem(f"{pressure:.1f}")
-            press_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 3, press_item)
-            
-            # Temperature
-            temperature = record.get('temperature', 0)
-            temp_item = QTableWidgetItem(f"{temperature:.1f}")
-            temp_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 4, temp_item)
-        
-        self.table.resizeRowsToContents()
+        self.model.set_records(records or [])
+        self.update_count()
+    
+    def set_columns(self, columns):
+        self.model.set_columns(columns or {})
+        self.update_count()
+    
+    def on_filter_changed(self, text):
+        self.model.set_filter(text)
+        self.update_count()
+    
+    def update_count(self):
+        shown = self.model.rowCount()
+        total = self.model.total_count()
+        if shown == total:
+            self.count_label.setText(f"{total} records")
+        else:
+            self.count_label.setText(f"{shown} of {total} records")
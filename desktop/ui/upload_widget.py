@@ -3,7 +3,6 @@ CSV Upload Widget for the Desktop App.
 """
 
 import os
-import requests
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
     QPushButton, QFileDialog, QGroupBox, QMessageBox,
@@ -11,6 +10,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 
+from .workers import start_request
+
 
 class UploadWidget(QWidget):
     upload_success = pyqtSignal(dict)
@@ -18,12 +19,9 @@ class UploadWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.selected_file = None
-        self.token = None
+        self.worker = None
         self.init_ui()
     
-    def set_token(self, token):
-        self.token = token
-    
     def init_ui(self):
         layout = QVBoxLayout(self)
         layout.setSpacing(20)
@@ -81,6 +79,12 @@ class UploadWidget(QWidget):
         self.upload_btn.setEnabled(False)
         btn_layout.addWidget(self.upload_btn)
         
+        self.cancel_btn = QPushButton("✖ Cancel")
+        self.cancel_btn.setObjectName("secondaryBtn")
+        self.cancel_btn.clicked.connect(self.cancel_upload)
+        self.cancel_btn.setVisible(False)
+        btn_layout.addWidget(self.cancel_btn)
+        
         upload_layout.addLayout(btn_layout)
         
         # Progress bar
@@ -143,63 +147,81 @@ class UploadWidget(QWidget):
             self.upload_btn.setEnabled(True)
     
     def upload_file(self):
-        if not self.selected_file:
+        if not self.selected_file or self.worker:
             return
         
         self.progress.setVisible(True)
         self.progress.setValue(0)
         self.upload_btn.setEnabled(False)
         self.browse_btn.setEnabled(False)
+        self.cancel_btn.setVisible(True)
+        
+        self.worker = start_request(
+            'POST', '/api/upload/',
+            upload_path=self.selected_file,
+            on_progress=self.on_upload_progress,
+            on_finished=self.on_upload_finished,
+            on_error=self.on_request_error,
+            on_cancelled=self.on_cancelled
+        )
+    
+    def cancel_upload(self):
+        if self.worker:
+            self.worker.cancel()
+    
+    def on_upload_progress(self, sent, total):
+        # The upload is the bulk of the work; loading the records fills the rest
+        if total:
+            self.progress.setValue(int(sent * 90 / total))
+    
+    def on_upload_finished(self, response):
+        if response.status_code != 201:
+            data = response.json() or {}
+            self.finish()
+            QMessageBox.warning(self, "Error", data.get('error', 'Upload failed'))
+            return
+        
+        # The upload response only carries the summary; fetch every record as columns
+        summary = response.json()
+        self.worker = start_request(
+            'GET', f"/api/columns/{summary['id']}/?format=json",
+            on_finished=lambda records: self.on_records_finished(summary, records),
+            on_error=self.on_request_error,
+            on_cancelled=self.on_cancelled
+        )
+    
+    def on_records_finished(self, summary, response):
+        data = dict(summary)
+        if response.status_code == 200:
+            data['columns'] = response.json()
+        self.progress.setValue(100)
+        self.finish()
+        
+        QMessageBox.information(
+            self, 
+            "Success", 
+            f"Successfully uploaded!\nFound {data.get('total_count', 0)} equipment records."
+        )
+        
+        # Reset UI
+        self.selected_file = None
+        self.file_label.setText("No file selected")
+        self.file_label.setStyleSheet("font-size: 16px; color: #94a3b8;")
+        self.upload_btn.setEnabled(False)
         
-        try:
-            headers = {}
-            if self.token:
-                headers['Authorization'] = f'Token {self.token}'
-            
-            with open(self.selected_file, 'rb') as f:
-                files = {'file': (os.path.basename(self.selected_file), f, 'text/csv')}
-                
-                self.progress.setValue(30)
-                
-                response = requests.post(
-                    'http://localhost:8000/api/upload/',
-                    files=files,
-                    headers=headers
-                )
-                
-                self.progress.setValue(80)
-                
-                if response.status_code == 201:
-                    self.progress.setValue(100)
-                    data = response.json()
-                    
-                    QMessageBox.information(
-                        self, 
-                        "Success", 
-                        f"Successfully uploaded!\nFound {data.get('total_count', 0)} equipment records."
-                    )
-                    
-                    # Reset UI
-                    self.selected_file = None
-                    self.file_label.setText("No file selected")
-                    self.file_label.setStyleSheet("font-size: 16px; color: #94a3b8;")
-                    
-                    # Emit signal with data
-                    self.upload_success.emit(data)
-                else:
-                    error_msg = response.json().get('error', 'Upload failed')
-                    QMessageBox.warning(self, "Error", error_msg)
-        
-        except requests.exceptions.ConnectionError:
-            QMessageBox.critical(
-                self, 
-                "Connection Error", 
-                "Cannot connect to the server.\nMake sure the Django backend is running on http://localhost:8000"
-            )
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
-        
-        finally:
-            self.progress.setVisible(False)
-            self.upload_btn.setEnabled(bool(self.selected_file))
-            self.browse_btn.setEnabled(True)
+        # Emit signal with data
+        self.upload_success.emit(data)
+    
+    def on_request_error(self, message):
+        self.finish()
+        QMessageBox.warning(self, "Error", message)
+    
+    def on_cancelled(self):
+        self.finish()
+    
+    def finish(self):
+        self.worker = None
+        self.progress.setVisible(False)
+        self.cancel_btn.setVisible(False)
+        self.upload_btn.setEnabled(bool(self.selected_file))
+        self.browse_btn.setEnabled(True)
@@ -0,0 +1,238 @@
+"""
+Background HTTP workers for the Desktop App.
+
+Requests run on QThreadPool threads so the GUI stays responsive. Each
+RequestWorker reports through Qt signals, which are delivered on the GUI
+thread:
+
+- progress(done, total): bytes sent while uploading, then bytes received
+  while downloading (total is 0 when the size is unknown)
+- finished(result): an ApiResult once the whole response has arrived
+- error(message): connection or other failure
+- cancelled(): the request was stopped with cancel()
+"""
+
+import json
+import os
+import uuid
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from .api_client import get_client
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+class ApiResult:
+    """Status, headers (case-insensitive) and body of a finished request."""
+    
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+    
+    def json(self):
+        return json.loads(self.content) if self.content else None
+
+
+class MultipartFileBody:
+    """
+    Streaming multipart/form-data body for a single file field.
+    
+    requests sends any object with read() and a length chunk by chunk, so
+    the file is never loaded into memory and every read reports how many
+    bytes have actually been handed to the socket.
+    """
+    
+    def __init__(self, path, field='file', content_type='text/csv', on_read=None, is_cancelled=None):
+        self.boundary = uuid.uuid4().hex
+        filename = os.path.basename(path)
+        self.parts = [
+            (
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n'
+            ).encode('utf-8'),
+            open(path, 'rb'),
+            f'\r\n--{self.boundary}--\r\n'.encode('utf-8'),
+        ]
+        self.length = len(self.parts[0]) + os.path.getsize(path) + len(self.parts[2])
+        self.sent = 0
+        self.on_read = on_read
+        self.is_cancelled = is_cancelled
+    
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+    
+    def __len__(self):
+        return self.length
+    
+    def read(self, size=CHUNK_SIZE):
+        if self.is_cancelled and self.is_cancelled():
+            raise RequestCancelled()
+        if size is None or size < 0:
+            size = self.length
+        
+        data = b''
+        while self.parts and len(data) < size:
+            part = self.parts[0]
+            wanted = size - len(data)
+            if isinstance(part, bytes):
+                data += part[:wanted]
+                if len(part) > wanted:
+                    self.parts[0] = part[wanted:]
+                else:
+                    self.parts.pop(0)
+            else:
+                chunk = part.read(wanted)
+                data += chunk
+                if not chunk:
+                    part.close()
+                    self.parts.pop(0)
+        
+        self.sent += len(data)
+        if self.on_read:
+            self.on_read(self.sent, self.length)
+        return data
+    
+    def close(self):
+        for part in self.parts:
+            if not isinstance(part, bytes):
+                part.close()
+        self.parts = []
+
+
+class RequestSignals(QObject):
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class RequestWorker(QRunnable):
+    """
+    Perform one HTTP request on a pool thread through the shared ApiClient.
+    
+    Args:
+        method: HTTP method
+        url: API path (e.g. '/api/history/') or absolute URL
+        headers: Extra request headers
+        json_body: Object sent as a JSON body
+        upload_path: File sent as the 'file' field of a multipart body
+        download_path: Write the response body to this file instead of
+            keeping it in memory (ApiResult.content is then empty)
+        timeout: Timeout in seconds (the client's default when None)
+    """
+    
+    def __init__(self, method, url, headers=None, json_body=None, upload_path=None, download_path=None, timeout=None):
+        super().__init__()
+        self.method = method
+        self.url = url
+        self.headers = dict(headers or {})
+        self.json_body = json_body
+        self.upload_path = upload_path
+        self.download_path = download_path
+        self.timeout = timeout
+        self.signals = RequestSignals()
+        self._cancelled = False
+    
+    def cancel(self):
+        """Stop the transfer at the next chunk boundary."""
+        self._cancelled = True
+    
+    def is_cancelled(self):
+        return self._cancelled
+    
+    def run(self):
+        try:
+            result = self.perform()
+        except Exception as e:
+            # Cancelling mid-upload can surface as a connection error from requests
+            if self._cancelled or isinstance(e, RequestCancelled):
+                self.signals.cancelled.emit()
+            elif isinstance(e, requests.exceptions.ConnectionError):
+                self.signals.error.emit("Cannot connect to the server. Make sure the backend is running.")
+            else:
+                self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+    
+    def perform(self):
+        body = None
+        if self.upload_path:
+            body = MultipartFileBody(
+                self.upload_path,
+                on_read=self.signals.progress.emit,
+                is_cancelled=self.is_cancelled
+            )
+            self.headers['Content-Type'] = body.content_type
+        
+        try:
+            response = get_client().request(
+                self.method, self.url,
+                headers=self.headers,
+                json=self.json_body,
+                data=body,
+                stream=True,
+                timeout=self.timeout or get_client().timeout
+            )
+        finally:
+            if body is not None:
+                body.close()
+        
+        with response:
+            total = int(response.headers.get('Content-Length') or 0)
+            received = 0
+            chunks = []
+            out = open(self.download_path + '.part', 'wb') if self.download_path and response.ok else None
+            try:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if self._cancelled:
+                        raise RequestCancelled()
+                    if out:
+                        out.write(chunk)
+                    else:
+                        chunks.append(chunk)
+                    received += len(chunk)
+                    self.signals.progress.emit(received, total)
+            except BaseException:
+                if out:
+                    out.close()
+                    os.unlink(self.download_path + '.part')
+                raise
+            if out:
+                out.close()
+                os.replace(self.download_path + '.part', self.download_path)
+        
+        return ApiResult(response.status_code, CaseInsensitiveDict(response.headers), b''.join(chunks))
+
+
+def start_request(method, url, on_finished=None, on_error=None, on_progress=None, on_cancelled=None, **kwargs):
+    """
+    Create a RequestWorker, connect its signals and start it on the global pool.
+    
+    Keep a reference to the returned worker for as long as its signals
+    are needed (and to cancel it).
+    
+    Returns:
+        The started RequestWorker
+    """
+    worker = RequestWorker(method, url, **kwargs)
+    for signal, slot in (
+        (worker.signals.finished, on_finished),
+        (worker.signals.error, on_error),
+        (worker.signals.progress, on_progress),
+        (worker.signals.cancelled, on_cancelled),
+    ):
+        if slot is not None:
+            signal.connect(slot)
+    QThreadPool.globalInstance().start(worker)
+    return worker
@@ -69,6 +69,10 @@ function CSVUpload({ token, onUploadSuccess }) {
                 }
             })
 
+            // The upload response only carries the summary; fetch the first page of
+            // records (the dashboard follows the next link for the rest)
+            const detail = await axios.get(response.data.records_url, { headers })
+
             setSuccess(`Successfully uploaded! Found ${response.data.total_count} equipment records.`)
             setFile(null)
             if (fileInputRef.current) {
@@ -77,7 +81,7 @@ function CSVUpload({ token, onUploadSuccess }) {
 
             // Notify parent component
             if (onUploadSuccess) {
-                onUploadSuccess(response.data)
+                onUploadSuccess(detail.data)
             }
         } catch (err) {
             console.error('Upload error:', err)
@@ -32,6 +32,15 @@ const API_BASE = 'http://localhost:8000'
 function Dashboard({ dataset, token }) {
     const [loading, setLoading] = useState(false)
     const [error, setError] = useState(null)
+    // Records from later pages of /api/data/<id>/, appended by "Load more"
+    const [moreRecords, setMoreRecords] = useState([])
+    const [nextUrl, setNextUrl] = useState(dataset.next || null)
+    const [loadingMore, setLoadingMore] = useState(false)
+
+    useEffect(() => {
+        setMoreRecords([])
+        setNextUrl(dataset.next || null)
+    }, [dataset])
 
     // Colors for charts
     const chartColors = [
@@ -121,7 +130,7 @@ function Dashboard({ dataset, token }) {
     }
 
     // Line chart data - Parameter trends across equipment
-    const records = dataset.records || []
+    const records = [...(dataset.records || []), ...moreRecords]
     const lineData = {
         labels: records.slice(0, 15).map(r => r.equipment_name?.substring(0, 10) || ''),
         datasets: [
@@ -203,6 +212,26 @@ function Dashboard({ dataset, token }) {
         }
     }
 
+    const handleLoadMore = async () => {
+        setLoadingMore(true)
+        setError(null)
+        try {
+            const headers = {}
+            if (token) {
+                headers['Authorization'] = `Token ${token}`
+            }
+
+            const response = await axios.get(nextUrl, { headers })
+            setMoreRecords(prev => [...prev, ...response.data.records])
+            setNextUrl(response.data.next)
+        } catch (err) {
+            setError('Failed to load more records')
+            console.error(err)
+        } finally {
+            setLoadingMore(false)
+        }
+    }
+
     return (
         <div>
             {/* Summary Statistics */}
@@ -270,7 +299,9 @@ function Dashboard({ dataset, token }) {
                 <div className="card-header">
                     <h2 className="card-title">📋 Equipment Records</h2>
                     <span style={{ color: 'var(--text-secondary)' }}>
-                        {records.length} records
+                        {records.length < (dataset.total_count || 0)
+                            ? `Showing ${records.length} of ${dataset.total_count} records`
+                            : `${records.length} records`}
                     </span>
                 </div>
 
@@ -310,6 +341,18 @@ function Dashboard({ dataset, token }) {
                         </tbody>
                     </table>
                 </div>
+
+                {nextUrl && (
+                    <div style={{ textAlign: 'center', marginTop: '1rem' }}>
+                        <button
+                            className="btn btn-secondary"
+                            onClick={handleLoadMore}
+                            disabled={loadingMore}
+                        >
+                            {loadingMore ? 'Loading...' : 'Load more records'}
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     )
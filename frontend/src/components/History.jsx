@@ -202,7 +202,7 @@ function History({ token, onSelectDataset }) {
                 textAlign: 'center'
             }}>
                 <p style={{ color: 'var(--text-secondary)', fontSize: '0.875rem' }}>
-                    💡 The system keeps the last 5 uploaded datasets. Click on any dataset to view its dashboard.
+                    💡 Only your most recent datasets are kept, as set by the server's retention policy. Click on any dataset to view its dashboard.
                 </p>
             </div>
         </div>